@@ -1,15 +1,41 @@
 import os
+import queue
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import messagebox, ttk
 
-from services.ai_service import TollAnalyzer
+from services.ai_cache import (
+    AI_CACHE_FILE,
+    DEFAULT_MAX_AGE_DAYS,
+    DEFAULT_MAX_ENTRIES,
+    AnalysisCache,
+)
+from services.ai_service import DEFAULT_MODEL, TollAnalyzer
 from services.data_service import DataService
-from services.pdf_service import PDFHandler
+from services.document_pool import (
+    DEFAULT_IDLE_TIMEOUT,
+    DEFAULT_POOL_SIZE,
+    DocumentPool,
+)
+from services.fake_backend import FakeBackend
+from services.gemini_client import get_gate
+from services.pdf_service import TILE_SIZE, PDFHandler
+from services.prefetch_service import PagePrefetcher
+from services.render_cache import DEFAULT_BUDGET_MB, RenderCache
+from services.speculative_service import (
+    DEFAULT_LOOKAHEAD,
+    DEFAULT_MAX_CONCURRENT,
+    SpeculativeAnalyzer,
+)
+from services.text_service import DEFAULT_MIN_CONFIDENCE
 
 from .calculator import Calculator
 from .pdf_list import PDFList
 from .pdf_viewer import PDFViewer
 
+# Progressive rendering shows a preview at 1/PREVIEW_DOWNSCALE of the zoom
+PREVIEW_DOWNSCALE = 3
+
 
 class TollManagerApp(ttk.Frame):
     def __init__(self, parent):
@@ -17,8 +43,93 @@ class TollManagerApp(ttk.Frame):
         self.columnconfigure(0, weight=1)
         self.rowconfigure(0, weight=1)
 
-        self.pdf_handler = PDFHandler()
-        self.ai_service = TollAnalyzer()
+        config = DataService.load_config()
+        cache_mb = config.get("render_cache_mb", DEFAULT_BUDGET_MB)
+        self.render_cache = RenderCache(max_bytes=int(cache_mb) * 1024 * 1024)
+        self.document_pool = DocumentPool(
+            max_size=config.get("document_pool_size", DEFAULT_POOL_SIZE),
+            idle_timeout=config.get("document_pool_idle_s", DEFAULT_IDLE_TIMEOUT),
+        )
+        self.pdf_handler = PDFHandler(
+            render_cache=self.render_cache, document_pool=self.document_pool
+        )
+        self.prefetcher = PagePrefetcher(self.render_cache)
+        # At or above this zoom only the visible tiles of a page are rendered
+        self.tiled_zoom_threshold = config.get("tiled_zoom_threshold", 1.6)
+        # Show a cheap grayscale preview while the full page renders
+        self.progressive_render = config.get("progressive_render", True)
+        self._render_future = None
+        self._render_token = None
+        # (path, page index, zoom) of the tiled page and its tile renders
+        self._tile_token = None
+        self._tile_futures = {}
+        try:
+            ai_cache = AnalysisCache(
+                config.get("ai_cache_file", AI_CACHE_FILE),
+                max_entries=config.get("ai_cache_max_entries", DEFAULT_MAX_ENTRIES),
+                max_age_days=config.get("ai_cache_max_age_days", DEFAULT_MAX_AGE_DAYS),
+            )
+        except Exception as e:
+            print(f"AI result cache disabled: {e}")
+            ai_cache = None
+        # Limits for all Gemini traffic (interactive, speculative, model list)
+        get_gate().configure(
+            max_concurrent=config.get("ai_max_concurrent"),
+            requests_per_minute=config.get("ai_requests_per_minute"),
+        )
+        backend = None
+        if config.get("ai_backend") == "fake":
+            # Offline demo/load testing; answers are made up
+            backend = FakeBackend(**config.get("ai_fake_backend", {}))
+        self.ai_service = TollAnalyzer(
+            cache=ai_cache,
+            payload=config.get("ai_payload"),
+            cascade=config.get("ai_cascade"),
+            backend=backend,
+        )
+        self.ai_executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="ai-analysis"
+        )
+        # (pdf path, page index) and Future of the running interactive analysis
+        self._analysis_key = None
+        self._analysis_future = None
+        self._streamed_rows = 0
+        # Saves are journaled; the workbook is written on this worker
+        self.excel_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="excel-writer"
+        )
+        self.excel_flush_ms = int(config.get("excel_flush_s", 10) * 1000)
+        self._flush_job = None
+        if len(DataService.get_journal()):
+            # Saves left over from a crash or a locked workbook
+            self.schedule_excel_flush()
+        # Digital PDFs are read from their text layer without calling the AI
+        self.text_min_confidence = config.get(
+            "text_min_confidence", DEFAULT_MIN_CONFIDENCE
+        )
+        # Opt-in background analysis of the next pages ("speed run" mode).
+        # Its renders get their own worker so they never queue ahead of the
+        # page the operator is waiting for.
+        self.speculative_renderer = PagePrefetcher(self.render_cache)
+        self.speculative = SpeculativeAnalyzer(
+            self.ai_service,
+            lambda path, page_idx: self.speculative_renderer.render(
+                path, page_idx, 2.0
+            ),
+            max_concurrent=config.get(
+                "speculative_max_concurrent", DEFAULT_MAX_CONCURRENT
+            ),
+            read_text=lambda path, page_idx: self.speculative_renderer.read_text(
+                path, page_idx, self.text_min_confidence
+            ),
+        )
+        # Following files whose page count is being read for speculation
+        self._counting_pages = set()
+        self.speculative_lookahead = config.get(
+            "speculative_lookahead", DEFAULT_LOOKAHEAD
+        )
+        # Fill the calculator row by row while Gemini is still answering
+        self.stream_analysis = config.get("ai_streaming", True)
 
         # Main horizontal paned window
         self.paned_window = ttk.PanedWindow(self, orient=tk.HORIZONTAL)
@@ -40,11 +151,18 @@ class TollManagerApp(ttk.Frame):
         self.pdf_list.tree.bind("<<TreeviewSelect>>", self.load_pdf)
         self.pdf_viewer.bind("<<PrevPage>>", self.prev_page)
         self.pdf_viewer.bind("<<NextPage>>", self.next_page)
+        self.pdf_viewer.bind("<<ZoomChanging>>", self.on_zoom_changing)
         self.pdf_viewer.bind("<<ZoomChanged>>", self.on_zoom_changed)
+        self.pdf_viewer.bind("<<ViewportChanged>>", self.fill_visible_tiles)
 
         # Bind Save Button from Calculator
         self.calculator.save_btn.config(command=self.on_save_next)
         self.calculator.analyze_btn.config(command=self.on_run_analysis)
+        self.calculator.cancel_analysis_btn.config(command=self.cancel_analysis)
+        self.calculator.speculative_var.set(config.get("speculative_analysis", False))
+        self.calculator.speculative_check.config(command=self.schedule_speculative)
+        self.calculator.cascade_var.set(config.get("model_cascade", False))
+        self.calculator.cascade_check.config(command=self.schedule_speculative)
         self.calculator.clean_btn.config(command=self.on_clean_toll)
         self.calculator.flag_btn.config(command=self.on_flag_file)
         self.calculator.highlight_btn.config(command=self.on_highlight_file)
@@ -88,6 +206,9 @@ class TollManagerApp(ttk.Frame):
             else:
                 self.calculator.highlight_btn.config(text="📌 Highlight Item (Ctrl+H)")
 
+            # The user jumped elsewhere, drop prefetches for the old position
+            self.prefetcher.cancel()
+
             print(f"Attempting to open: {full_path}")  # Debug
             if self.pdf_handler.open_pdf(full_path):
                 print("PDF Opened successfully. Showing page...")
@@ -97,18 +218,327 @@ class TollManagerApp(ttk.Frame):
             else:
                 print("Failed to open PDF.")
 
+    def on_zoom_changing(self, event):
+        # A render for the previous zoom would overwrite the interim rescale
+        self.cancel_pending_render()
+        self.prefetcher.cancel()
+
     def on_zoom_changed(self, event):
+        page_idx = self.pdf_handler.current_page_idx
+        zoom = self.pdf_viewer.zoom_level
+        if (
+            self.progressive_render
+            and zoom < self.tiled_zoom_threshold
+            and self.pdf_viewer.current_image is not None
+            and not self.pdf_handler.has_cached_page(page_idx, zoom)
+        ):
+            # The interim rescale stays up until the sharp render replaces it
+            self.cancel_pending_render()
+            self.show_progressive_page(page_idx, zoom, preview=False)
+            self.schedule_prefetch()
+            return
         self.show_current_page()
 
     def show_current_page(self):
         page_idx = self.pdf_handler.current_page_idx
         zoom = self.pdf_viewer.zoom_level
-        img = self.pdf_handler.get_page_image(page_idx, zoom=zoom)
-        # Pass 1-based index for display
-        self.pdf_viewer.display_image(
-            img, page_idx + 1, self.pdf_handler.get_page_count()
-        )
+        self.cancel_pending_render()
+        if self._analysis_key != (self.pdf_handler.path, page_idx):
+            self.cancel_analysis()
+        if zoom >= self.tiled_zoom_threshold:
+            self.show_tiled_page(page_idx, zoom)
+        elif self.progressive_render and not self.pdf_handler.has_cached_page(
+            page_idx, zoom
+        ):
+            self.show_progressive_page(page_idx, zoom)
+        else:
+            rendered = self.pdf_handler.get_page_pnm(page_idx, zoom=zoom)
+            # Pass 1-based index for display
+            self.pdf_viewer.display_page(
+                rendered, page_idx + 1, self.pdf_handler.get_page_count(), zoom
+            )
         self.update_clean_btn_state()
+        self.schedule_prefetch()
+        self.adopt_speculative_result()
+        self.schedule_speculative()
+
+    def show_progressive_page(self, page_idx, zoom, preview=True):
+        """
+        Two-stage render: a low-DPI grayscale preview is shown right away and
+        the full-quality page replaces it when the background render is done.
+        With preview=False whatever is on screen (e.g. the interim zoom
+        rescale) stays until then.
+        """
+        page_count = self.pdf_handler.get_page_count()
+        if preview:
+            rendered = self.pdf_handler.get_page_pnm(
+                page_idx, zoom=zoom / PREVIEW_DOWNSCALE, colorspace="gray"
+            )
+            self.pdf_viewer.display_preview(
+                rendered, PREVIEW_DOWNSCALE, page_idx + 1, page_count, zoom
+            )
+
+        token = (self.pdf_handler.path, page_idx, zoom)
+        self._render_token = token
+        self._render_future = self.prefetcher.render(
+            self.pdf_handler.path, page_idx, zoom
+        )
+
+        def on_rendered(rendered):
+            # Drop results for pages (or zoom levels) the user has left
+            if self._render_token != token or rendered is None:
+                return
+            self._render_token = None
+            self._render_future = None
+            self.pdf_viewer.display_page(rendered, page_idx + 1, page_count, zoom)
+
+        self.watch_future(self._render_future, on_rendered)
+
+    def cancel_pending_render(self):
+        self._render_token = None
+        if self._render_future is not None:
+            self._render_future.cancel()
+            self._render_future = None
+        self._tile_token = None
+        for future in self._tile_futures.values():
+            future.cancel()
+        self._tile_futures = {}
+
+    def watch_future(
+        self,
+        future,
+        callback,
+        interval=15,
+        updates=None,
+        on_update=None,
+        on_error=None,
+    ):
+        """
+        Polls a concurrent.futures.Future from the Tk main loop and calls
+        callback(result) on the main thread once it completes successfully,
+        or on_error(exception) if the task raised.
+        Items the task puts on the `updates` queue are passed to
+        on_update(item) on the main thread before the callback.
+        """
+
+        def poll():
+            if updates is not None:
+                while True:
+                    try:
+                        item = updates.get_nowait()
+                    except queue.Empty:
+                        break
+                    on_update(item)
+            if not future.done():
+                self.after(interval, poll)
+                return
+            if future.cancelled():
+                return
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Background task failed: {e}")
+                if on_error is not None:
+                    on_error(e)
+                return
+            callback(result)
+
+        self.after(interval, poll)
+
+    def show_tiled_page(self, page_idx, zoom):
+        """
+        High zoom path: sets up the full-size scroll region and renders only
+        the tiles around the visible part of the canvas.
+        """
+        size = self.pdf_handler.get_page_size(page_idx)
+        if not size:
+            self.pdf_viewer.display_page(None, page_idx + 1, 0)
+            return
+        width = int(round(size[0] * zoom))
+        height = int(round(size[1] * zoom))
+        self.pdf_viewer.begin_tiled_page(
+            width, height, TILE_SIZE, page_idx + 1, self.pdf_handler.get_page_count()
+        )
+        self._tile_token = (self.pdf_handler.path, page_idx, zoom)
+        self.fill_visible_tiles()
+
+    def fill_visible_tiles(self, event=None):
+        """
+        Requests the tiles that scrolled into view from the render worker;
+        each is placed when done, unless the page or zoom changed meanwhile.
+        """
+        if not self.pdf_viewer.tiled or self._tile_token is None:
+            return
+        token = self._tile_token
+        path, page_idx, zoom = token
+        for tile in self.pdf_viewer.visible_tiles():
+            if tile in self._tile_futures:
+                continue  # Requested already (or outside the page)
+            future = self.prefetcher.render_tile(path, page_idx, zoom, *tile, TILE_SIZE)
+            self._tile_futures[tile] = future
+            self.watch_future(
+                future,
+                lambda rendered, tile=tile: self.on_tile_rendered(
+                    token, tile, rendered
+                ),
+            )
+
+    def on_tile_rendered(self, token, tile, rendered):
+        if token != self._tile_token:
+            return
+        self.pdf_viewer.place_tile(*tile, rendered)
+
+    def schedule_prefetch(self):
+        """
+        Renders the neighbouring pages (and page 1 of the next file when on
+        the last page) in the background so the next navigation is instant.
+        """
+        path = self.pdf_handler.path
+        if not path:
+            return
+
+        page_idx = self.pdf_handler.current_page_idx
+        page_count = self.pdf_handler.get_page_count()
+        zoom = self.pdf_viewer.zoom_level
+        if zoom >= self.tiled_zoom_threshold:
+            # Whole-page renders at high zoom are what tiling avoids
+            self.prefetcher.cancel()
+            return
+
+        jobs = []
+        if page_idx + 1 < page_count:
+            jobs.append((path, page_idx + 1, zoom))
+        else:
+            next_path = self.pdf_list.get_adjacent_path(1)
+            if next_path:
+                jobs.append((next_path, 0, zoom))
+        if page_idx > 0:
+            jobs.append((path, page_idx - 1, zoom))
+
+        self.prefetcher.prefetch(jobs)
+
+    def upcoming_pages(self, count):
+        """
+        Returns up to count (path, page index) keys after the current page:
+        the rest of this file, then the pages of the following files.
+
+        A following file's page count comes from the speculative renderer,
+        which opens it in the background; until it is known only its first
+        page is listed, and schedule_speculative() runs again afterwards.
+        """
+        path = self.pdf_handler.path
+        if not path or count <= 0:
+            return []
+
+        page_idx = self.pdf_handler.current_page_idx
+        page_count = self.pdf_handler.get_page_count()
+        keys = [(path, i) for i in range(page_idx + 1, page_count)][:count]
+        for next_path in self.pdf_list.get_following_paths(count - len(keys)):
+            if len(keys) >= count:
+                break
+            pages = self.speculative_renderer.page_counts.get(next_path)
+            if pages is None:
+                keys.append((next_path, 0))
+                if next_path not in self._counting_pages:
+                    self._counting_pages.add(next_path)
+                    self.watch_future(
+                        self.speculative_renderer.page_count(next_path),
+                        lambda _, p=next_path: self.on_page_count(p),
+                        interval=50,
+                    )
+                break
+            keys.extend((next_path, i) for i in range(min(pages, count - len(keys))))
+        return keys
+
+    def on_page_count(self, path):
+        self._counting_pages.discard(path)
+        self.schedule_speculative()
+
+    def schedule_speculative(self):
+        # Pre-analysis uses one model; its answers are not used by the cascade
+        if (
+            not self.calculator.speculative_var.get()
+            or self.calculator.cascade_var.get()
+        ):
+            self.speculative.cancel_all()
+            return
+        targets = self.upcoming_pages(self.speculative_lookahead)
+        self.speculative.update(targets, self.calculator.gemini_model.get())
+
+    def adopt_speculative_result(self):
+        """
+        If the current page was pre-analyzed, shows its result right away
+        (or takes over the still running request as the interactive one).
+        """
+        key = (self.pdf_handler.path, self.pdf_handler.current_page_idx)
+        future = self.speculative.take(key)
+        if future is None or self._analysis_future is not None:
+            return
+        if (
+            self.calculator.cascade_var.get()
+            or self.speculative.model != self.calculator.gemini_model.get()
+        ):
+            # Pre-analysis used a single model; the operator wants another path
+            future.cancel()
+            return
+
+        self._analysis_key = key
+        self._analysis_future = future
+        if not future.done():
+            self.calculator.show_analysis_progress(
+                f"Finishing pre-analysis of page {key[1] + 1}..."
+            )
+        self.watch_future(
+            future,
+            lambda result: self.on_analysis_done(key, future, result),
+            interval=1 if future.done() else 15,
+            on_error=lambda e: self.on_analysis_failed(key, future, e),
+        )
+
+    def schedule_excel_flush(self):
+        """Writes journaled saves to Excel once saving pauses for a moment."""
+        if self._flush_job is not None:
+            self.after_cancel(self._flush_job)
+        self._flush_job = self.after(self.excel_flush_ms, self.flush_excel)
+
+    def flush_excel(self):
+        self._flush_job = None
+        future = self.excel_executor.submit(DataService.materialize_all)
+
+        def done(results):
+            for success, msg in results:
+                if not success:
+                    print(f"Excel update pending: {msg}")
+
+        self.watch_future(future, done, interval=100)
+
+    def shutdown(self):
+        """Stops background workers. Called once the main loop has exited."""
+        # The widgets are gone by now, so no cancel_analysis() here
+        if self._analysis_future is not None:
+            self._analysis_future.cancel()
+        self._analysis_key = None
+        self._analysis_future = None
+        # Whatever is still journaled goes to the workbook before exiting
+        self.excel_executor.shutdown(wait=True)
+        for success, msg in DataService.materialize_all():
+            if not success:
+                print(f"Excel not updated ({msg}); entries stay in the journal.")
+        report = self.ai_service.cascade_report()
+        if report["pages"]:
+            print(
+                f"Model cascade: {report['pages']} page(s), "
+                f"escalation rate {report['escalation_rate']:.0%}, "
+                f"cost/page {report['cost_per_page']:.5f}"
+            )
+        metrics = self.ai_service.gate.metrics()
+        if metrics["requests"]:
+            print(f"Gemini requests: {metrics}")
+        self.ai_executor.shutdown(wait=False, cancel_futures=True)
+        self.speculative.shutdown()
+        self.speculative_renderer.shutdown()
+        self.prefetcher.shutdown()
+        self.pdf_handler.close()
 
     def update_clean_btn_state(self):
         """Enable/disable the Clean Toll button based on whether this page has a saved entry."""
@@ -219,9 +649,10 @@ class TollManagerApp(ttk.Frame):
             # 2. Save
             # Use current_dir from pdf_list as save location
             folder = self.pdf_list.current_dir
-            success, msg = DataService.save_toll_entry(folder, data)
+            success, msg = DataService.save_toll_entry(folder, data, materialize=False)
 
             if success:
+                self.schedule_excel_flush()
                 messagebox.showinfo("Success", msg)
                 
                 # Mark as processed in UI
@@ -263,9 +694,12 @@ class TollManagerApp(ttk.Frame):
                 return
 
             folder = self.pdf_list.current_dir
-            success, msg = DataService.delete_toll_entry(pdf_name, page_num, folder)
-
+            # Journaled; the rows leave the workbook on the Excel worker
+            success, msg = DataService.delete_toll_entry(
+                pdf_name, page_num, folder, materialize=False
+            )
             if success:
+                self.schedule_excel_flush()
                 messagebox.showinfo("Cleaned", msg)
                 # Remove processed mark from UI
                 self.pdf_list.unmark_as_processed(pdf_name)
@@ -285,23 +719,109 @@ class TollManagerApp(ttk.Frame):
         if not self.pdf_handler.path:
             return
 
-        print("Running AI Analysis...")
-        # Get high-res image for AI (Zoom 2.0)
         page_idx = self.pdf_handler.current_page_idx
-        img = self.pdf_handler.get_page_image(page_idx, zoom=2.0)
+        key = (self.pdf_handler.path, page_idx)
+        if self._analysis_key == key:
+            return  # Already running for this page
+
+        self.cancel_analysis()
+
+        # Fast path: machine-readable amounts need no AI round trip
+        text_result = self.pdf_handler.extract_text_tolls(page_idx, 0.0)
+        if (
+            text_result is not None
+            and text_result["confidence"] >= self.text_min_confidence
+        ):
+            print("Amounts read from the PDF text layer.")
+            self.calculator.populate_results(
+                text_result["tolls"], text_result["total_calculated"]
+            )
+            return
 
-        # Call Service
-        # Use threading to prevent UI freeze?
-        # For now, sync is okay for prototype.
+        print("Running AI Analysis...")
         model = self.calculator.gemini_model.get()
-        if model:
-            result = self.ai_service.analyze_page(img, model=model)
-        else:
-            result = self.ai_service.analyze_page(img)
+        cascade = self.calculator.cascade_var.get()
+        # Entries streamed by the worker, shown as they arrive
+        streamed = queue.Queue() if self.stream_analysis and not cascade else None
+        # A total printed on the page still helps judge the AI's answer
+        text_total = text_result["text_total"] if text_result else None
+
+        # Get high-res image for AI (Zoom 2.0), rendered on the render worker
+        render_future = self.prefetcher.render(self.pdf_handler.path, page_idx, 2.0)
+
+        def analyze():
+            try:
+                rendered = render_future.result()
+            except Exception as e:
+                return {"error": str(e), "tolls": []}
+            if rendered is None:
+                return {"error": "Page could not be rendered", "tolls": []}
+            img = rendered.to_image()
+            if cascade:
+                return self.ai_service.analyze_cascade(img, text_total=text_total)
+            if streamed is not None:
+                return self.ai_service.analyze_page_stream(
+                    img,
+                    model=model or DEFAULT_MODEL,
+                    on_toll=streamed.put,
+                    # None tells on_toll_streamed that the rows start over
+                    on_restart=lambda: streamed.put(None),
+                )
+            if model:
+                return self.ai_service.analyze_page(img, model=model)
+            return self.ai_service.analyze_page(img)
+
+        future = self.ai_executor.submit(analyze)
+        self._analysis_key = key
+        self._analysis_future = future
+        self.calculator.show_analysis_progress(
+            f"Analyzing page {page_idx + 1} with "
+            f"{'model cascade' if cascade else model or 'default model'}..."
+        )
+        self._streamed_rows = 0
+        self.watch_future(
+            future,
+            lambda result: self.on_analysis_done(key, future, result),
+            updates=streamed,
+            on_update=lambda toll: self.on_toll_streamed(key, future, toll),
+            on_error=lambda e: self.on_analysis_failed(key, future, e),
+        )
+
+    def on_toll_streamed(self, key, future, toll):
+        if future is not self._analysis_future or key != (
+            self.pdf_handler.path,
+            self.pdf_handler.current_page_idx,
+        ):
+            return
+        if toll is None:
+            # The stream was retried and sends its entries again
+            if self._streamed_rows:
+                self.calculator.clear_results()
+                self._streamed_rows = 0
+            return
+        if not self._streamed_rows:
+            self.calculator.clear_results()
+        self._streamed_rows += 1
+        self.calculator.add_result_row(toll)
+
+    def on_analysis_done(self, key, future, result):
+        # Late answers for a page the operator has left are discarded
+        if future is not self._analysis_future or key != (
+            self.pdf_handler.path,
+            self.pdf_handler.current_page_idx,
+        ):
+            return
+        self._analysis_key = None
+        self._analysis_future = None
+        self.calculator.hide_analysis_progress()
 
         # Check error
         if "error" in result:
             print(f"Analysis Error: {result['error']}")
+            if self._streamed_rows:
+                # Rows from a stream that failed part-way are not a result
+                self.calculator.clear_results()
+                self._streamed_rows = 0
             return
 
         tolls = result.get("tolls", [])
@@ -309,7 +829,31 @@ class TollManagerApp(ttk.Frame):
 
         # Populate
         self.calculator.populate_results(tolls, total)
-        print("Analysis Complete.")
+        if "escalations" in result:
+            print(
+                f"Analysis Complete ({result['model']}, "
+                f"{result['escalations']} escalation(s))."
+            )
+            if result.get("low_confidence"):
+                print("Warning: no model produced a plausible result; please verify.")
+        else:
+            print("Analysis Complete.")
+
+    def on_analysis_failed(self, key, future, error):
+        # A crashed worker still has to release the page and the progress bar
+        self.on_analysis_done(key, future, {"error": str(error), "tolls": []})
+
+    def cancel_analysis(self):
+        """
+        Abandons the running analysis. A request already sent to Gemini cannot
+        be aborted, but its result is dropped when it arrives.
+        """
+        if self._analysis_future is None:
+            return
+        self._analysis_future.cancel()
+        self._analysis_key = None
+        self._analysis_future = None
+        self.calculator.hide_analysis_progress()
 
     def on_flag_file(self):
         is_flagged = self.pdf_list.toggle_flag_current()
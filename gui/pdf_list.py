@@ -214,6 +214,40 @@ class PDFList(ttk.Frame):
                     self.tree.item(child, text=new_text, tags=current_tags)
                 return
 
+    def get_adjacent_path(self, direction):
+        """
+        Returns the full path of the file after (+1) or before (-1) the
+        current selection, or None at either end of the list.
+        """
+        selection = self.tree.selection()
+        if not selection:
+            return None
+
+        if direction == 1:
+            item_id = self.tree.next(selection[0])
+        else:
+            item_id = self.tree.prev(selection[0])
+
+        if not item_id:
+            return None
+        values = self.tree.item(item_id, "values")
+        return values[0] if values else None
+
+    def get_following_paths(self, count):
+        """Returns the full paths of up to count files after the selection."""
+        selection = self.tree.selection()
+        if not selection:
+            return []
+
+        paths = []
+        item_id = self.tree.next(selection[0])
+        while item_id and len(paths) < count:
+            values = self.tree.item(item_id, "values")
+            if values:
+                paths.append(values[0])
+            item_id = self.tree.next(item_id)
+        return paths
+
     def on_select(self, event):
         # To be bound by the main app controller
         pass
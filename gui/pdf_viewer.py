@@ -1,7 +1,13 @@
 import tkinter as tk
+from fractions import Fraction
 from tkinter import ttk
 
-from PIL import Image, ImageTk
+from services.pdf_service import RenderedPage
+
+# Zoom changes are coalesced until the zoom is stable for this long
+ZOOM_SETTLE_MS = 250
+# Largest subsample factor used to approximate an interim zoom ratio
+MAX_SUBSAMPLE = 16
 
 
 class PDFViewer(ttk.Frame):
@@ -28,7 +34,7 @@ class PDFViewer(ttk.Frame):
         )
 
         self.canvas.configure(
-            yscrollcommand=self.scrollbar_y.set, xscrollcommand=self.scrollbar_x.set
+            yscrollcommand=self.on_yscroll, xscrollcommand=self.on_xscroll
         )
 
         self.scrollbar_y.pack(side="right", fill="y")
@@ -89,14 +95,53 @@ class PDFViewer(ttk.Frame):
 
         # State
         self.current_image = None
+        # One photo buffer reused for every page; only resized when needed
         self.tk_image = None
+        self.image_item = None
+        self.image_size = None
+        # Zoom the current raster was rendered at (for interim rescaling)
+        self.image_zoom = None
+        # The current raster as a photo, source of the interim rescales
+        self._source_photo = None
         self.zoom_level = 1.0
+        self._zoom_after_id = None
+
+        # Tiled mode (high zoom): (col, row) -> (canvas item, photo)
+        self.tiled = False
+        self.tile_size = None
+        self.tiles = {}
+        self._viewport_pending = False
 
         # Bind Ctrl+Wheel for Zoom (Windows/Linux)
         self.canvas.bind("<Control-MouseWheel>", self.on_ctrl_wheel)
+        self.canvas.bind("<Configure>", lambda e: self.notify_viewport_changed())
         # Bind also on the frame just in case focus is slightly off, though canvas usually needs focus
         # We'll rely on canvas for now.
 
+    def on_yscroll(self, first, last):
+        self.scrollbar_y.set(first, last)
+        self.notify_viewport_changed()
+
+    def on_xscroll(self, first, last):
+        self.scrollbar_x.set(first, last)
+        self.notify_viewport_changed()
+
+    def notify_viewport_changed(self):
+        """
+        Fires <<ViewportChanged>> once per idle cycle while in tiled mode,
+        so the app can render tiles that scrolled into view.
+        """
+        if not self.tiled or self._viewport_pending:
+            return
+        self._viewport_pending = True
+
+        def fire():
+            self._viewport_pending = False
+            if self.tiled:
+                self.event_generate("<<ViewportChanged>>")
+
+        self.after_idle(fire)
+
     def on_ctrl_wheel(self, event):
         # Windows: event.delta is +/- 120
         if event.delta > 0:
@@ -108,34 +153,90 @@ class PDFViewer(ttk.Frame):
         new_zoom = round(self.zoom_level + delta, 1)
         # partial constraint (0.4x to 3.0x)
         if 0.4 <= new_zoom <= 3.0:
-            self.zoom_level = new_zoom
-            self.zoom_label.config(text=f"{int(self.zoom_level * 100)}%")
-            self.event_generate("<<ZoomChanged>>")
+            self.set_zoom(new_zoom)
 
     def reset_zoom(self):
-        self.zoom_level = 1.0
-        self.zoom_label.config(text="100%")
+        self.set_zoom(1.0)
+
+    def set_zoom(self, zoom):
+        """
+        Updates the zoom right away with a cheap rescale of the last raster.
+        <<ZoomChanging>> fires on every step; <<ZoomChanged>> fires once the
+        zoom has been stable for ZOOM_SETTLE_MS.
+        """
+        self.zoom_level = zoom
+        self.zoom_label.config(text=f"{int(self.zoom_level * 100)}%")
+        self.event_generate("<<ZoomChanging>>")
+        self.show_interim_zoom()
+
+        if self._zoom_after_id is not None:
+            self.after_cancel(self._zoom_after_id)
+        self._zoom_after_id = self.after(ZOOM_SETTLE_MS, self._zoom_settled)
+
+    def _zoom_settled(self):
+        self._zoom_after_id = None
         self.event_generate("<<ZoomChanged>>")
 
-    def display_image(self, pil_image, page_num, total_pages):
-        self.canvas.delete("all")
+    def show_interim_zoom(self):
+        """Stretches the last rendered raster to the new zoom level."""
+        if self.tiled or self.current_image is None or not self.image_zoom:
+            return
+
+        # Tk scales photos by integer factors: zoom by n, subsample by d
+        factor = Fraction(self.zoom_level / self.image_zoom).limit_denominator(
+            MAX_SUBSAMPLE
+        )
+        if factor <= 0:
+            return
+        if self._source_photo is None:
+            # Decoded once per raster, not on every wheel step
+            self._source_photo = tk.PhotoImage(
+                data=self.current_image.data, format="PPM"
+            )
+        n, d = factor.numerator, factor.denominator
+        # Tk subsamples first, then zooms
+        width = -(-self.current_image.width // d) * n
+        height = -(-self.current_image.height // d) * n
+
+        self._ensure_photo(width, height)
+        self.tk_image.blank()
+        self.tk_image.tk.call(
+            self.tk_image.name,
+            "copy",
+            self._source_photo.name,
+            "-zoom",
+            n,
+            n,
+            "-subsample",
+            d,
+            d,
+        )
+
+    def display_image(self, pil_image, page_num, total_pages, zoom=None):
         if not pil_image:
+            self.display_page(None, page_num, total_pages)
             return
+        self.display_page(
+            RenderedPage.from_image(pil_image), page_num, total_pages, zoom
+        )
 
-        # Resize logic could go here (fit to width)
-        # For now, display as is
-        self.tk_image = ImageTk.PhotoImage(pil_image)
+    def display_page(self, rendered, page_num, total_pages, zoom=None):
+        """
+        Shows a RenderedPage by loading its PPM bytes into the reused photo
+        buffer. page_num is the 1-based page index for display, zoom the
+        level the page was rendered at.
+        """
+        if not rendered:
+            self.clear_image()
+            return
 
-        self.canvas.create_image(0, 0, image=self.tk_image, anchor="nw")
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self.clear_tiles()
+        self.current_image = rendered
+        self.image_zoom = zoom
+        self._source_photo = None
+        self._ensure_photo(rendered.width, rendered.height)
+        self.tk_image.configure(data=rendered.data, format="PPM")
 
-        self.page_label.config(
-            text=f"Page {page_num + 1} / {total_pages}"
-        )  # page_num is 0-indexed passed as 0, but label wants 1
-        # Wait, app.py passes 1-indexed? No wait, app.py passes 1. Let's align.
-        # App.py passed 1. So formatting there.
-        # Let's fix app.py to pass 0-indexed or fix display.
-        # Let's assume input 'page_num' is 1-based index for display.
         self.page_label.config(text=f"Page {page_num} / {total_pages}")
 
         # Enable/Disable buttons
@@ -143,6 +244,112 @@ class PDFViewer(ttk.Frame):
         self.prev_btn.config(state="normal")
         self.next_btn.config(state="normal")
 
+    def display_preview(self, rendered, scale, page_num, total_pages, zoom=None):
+        """
+        Shows a low resolution RenderedPage enlarged by an integer scale,
+        as a stand-in until the full resolution page is ready.
+        """
+        if not rendered:
+            self.clear_image()
+            return
+
+        self.clear_tiles()
+        self.current_image = rendered
+        self.image_zoom = zoom / scale if zoom else None
+        self._source_photo = None
+        self._ensure_photo(rendered.width * scale, rendered.height * scale)
+        preview = tk.PhotoImage(data=rendered.data, format="PPM")
+        self.tk_image.tk.call(
+            self.tk_image.name, "copy", preview.name, "-zoom", scale, scale
+        )
+
+        self.page_label.config(text=f"Page {page_num} / {total_pages}")
+        self.prev_btn.config(state="normal")
+        self.next_btn.config(state="normal")
+
+    def _ensure_photo(self, width, height):
+        if self.tk_image is None:
+            self.canvas.delete("placeholder")
+            self.tk_image = tk.PhotoImage(width=width, height=height)
+        elif self.image_size != (width, height):
+            self.tk_image.configure(width=width, height=height)
+
+        if self.image_item is None:
+            self.image_item = self.canvas.create_image(
+                0, 0, image=self.tk_image, anchor="nw"
+            )
+
+        if self.image_size != (width, height):
+            self.image_size = (width, height)
+            self.canvas.configure(scrollregion=(0, 0, width, height))
+
+    def clear_image(self):
+        if self.image_item is not None:
+            self.canvas.delete(self.image_item)
+            self.image_item = None
+        self.current_image = None
+        self.image_zoom = None
+        self._source_photo = None
+
+    def begin_tiled_page(self, width, height, tile_size, page_num, total_pages):
+        """
+        Switches to tiled mode for a page of width x height pixels. Tiles are
+        added afterwards with place_tile() as they scroll into view.
+        """
+        self.clear_image()
+        self.clear_tiles()
+        self.canvas.delete("placeholder")
+        self.tiled = True
+        self.tile_size = tile_size
+        self.image_size = (width, height)
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+
+        self.page_label.config(text=f"Page {page_num} / {total_pages}")
+        self.prev_btn.config(state="normal")
+        self.next_btn.config(state="normal")
+
+    def visible_tiles(self, margin=None):
+        """
+        Returns the (col, row) tiles intersecting the visible canvas region
+        plus a margin that are not placed yet, nearest to the top-left first.
+        """
+        if not self.tiled or not self.image_size:
+            return []
+        if margin is None:
+            margin = self.tile_size // 2
+
+        width, height = self.image_size
+        x0 = max(0, self.canvas.canvasx(0) - margin)
+        y0 = max(0, self.canvas.canvasy(0) - margin)
+        x1 = min(width, self.canvas.canvasx(self.canvas.winfo_width()) + margin)
+        y1 = min(height, self.canvas.canvasy(self.canvas.winfo_height()) + margin)
+
+        size = self.tile_size
+        tiles = []
+        for row in range(int(y0 // size), int((y1 - 1) // size) + 1):
+            for col in range(int(x0 // size), int((x1 - 1) // size) + 1):
+                if (col, row) not in self.tiles:
+                    tiles.append((col, row))
+        return tiles
+
+    def place_tile(self, col, row, rendered):
+        if not self.tiled or rendered is None or (col, row) in self.tiles:
+            return
+        photo = tk.PhotoImage(data=rendered.data, format="PPM")
+        item = self.canvas.create_image(
+            col * self.tile_size, row * self.tile_size, image=photo, anchor="nw"
+        )
+        self.tiles[(col, row)] = (item, photo)
+
+    def clear_tiles(self):
+        for item, _ in self.tiles.values():
+            self.canvas.delete(item)
+        self.tiles = {}
+        if self.tiled:
+            self.tiled = False
+            # Force the single-image path to reset the scrollregion
+            self.image_size = None
+
     def prev_page(self):
         self.event_generate("<<PrevPage>>")
 
@@ -21,6 +21,7 @@ def main():
     sv_ttk.set_theme("dark")
 
     root.mainloop()
+    app.shutdown()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,64 @@
+"""
+Headless batch analysis of every PDF page in a folder.
+
+Usage:
+    python scripts/batch_analyze.py "F:/Peajes Octubre" --concurrency 4 --rpm 60
+
+Results are appended to a JSONL file (batch_results.jsonl by default) and to
+the AI result cache used by the GUI, so operators get instant analyses the
+next morning. Re-running the same command resumes an interrupted batch.
+"""
+import argparse
+import os
+import sys
+
+# Make the project packages importable when run from scripts/
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from services.ai_cache import AI_CACHE_FILE, AnalysisCache
+from services.ai_service import TollAnalyzer
+from services.batch_service import BATCH_RESULTS_FILE, BatchAnalyzer, BatchResultsStore
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze all toll PDFs in a folder.")
+    parser.add_argument("folder", help="Folder containing the PDF files")
+    parser.add_argument("--results", default=BATCH_RESULTS_FILE, help="JSONL results file")
+    parser.add_argument("--cache", default=AI_CACHE_FILE, help="AI result cache file")
+    parser.add_argument("--model", default=None, help="Gemini model name")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=float, default=60, help="Requests per minute")
+    parser.add_argument("--retries", type=int, default=4)
+    parser.add_argument(
+        "--pages-per-request", type=int, default=1, help="Pages sent in one Gemini call"
+    )
+    args = parser.parse_args()
+
+    analyzer = TollAnalyzer(cache=AnalysisCache(args.cache))
+    batch = BatchAnalyzer(
+        analyzer,
+        store=BatchResultsStore(args.results),
+        model=args.model,
+        concurrency=args.concurrency,
+        requests_per_minute=args.rpm,
+        max_retries=args.retries,
+        pages_per_request=args.pages_per_request,
+    )
+
+    def progress(record):
+        status = record.get("error") or f"total {record['total_calculated']:.2f}"
+        print(f"{record['pdf']} page {record['page']}: {status}")
+
+    try:
+        stats = batch.run(args.folder, progress=progress)
+    except KeyboardInterrupt:
+        # Pages in flight were finished and stored before the interrupt surfaced
+        print("Interrupted. Re-run the same command to resume.")
+        stats = batch.stats
+    print(f"Done: {stats}")
+    print(f"Gemini requests: {analyzer.gate.metrics()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Offline load test of the analysis pipeline against the fake Gemini backend.
+
+Usage:
+    python scripts/benchmark_analysis.py --pages 200 --concurrency 8 --error-429 0.05
+
+Runs the batch pipeline over generated (or given) PDFs with no network and
+no API quota, and prints throughput, retry counts, gate metrics (in-flight,
+throttled, p50/p95) and what the fake server saw.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import fitz
+
+# Make the project packages importable when run from scripts/
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from services.ai_cache import AnalysisCache
+from services.ai_service import TollAnalyzer
+from services.batch_service import BatchAnalyzer, BatchResultsStore
+from services.fake_backend import FakeBackend
+from services.gemini_client import RequestGate
+
+
+def make_pdfs(folder, pages, pages_per_file=10):
+    """Writes PDFs whose pages differ, so every page gets its own answer."""
+    for start in range(0, pages, pages_per_file):
+        doc = fitz.open()
+        for n in range(start, min(pages, start + pages_per_file)):
+            page = doc.new_page()
+            page.insert_text((72, 72 + (n % 40) * 12), f"Ticket {n}")
+        doc.save(os.path.join(folder, f"bench_{start // pages_per_file + 1}.pdf"))
+        doc.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analysis with a fake backend.")
+    parser.add_argument("--folder", default=None, help="PDF folder (default: generated)")
+    parser.add_argument("--pages", type=int, default=100, help="Pages to generate")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=float, default=0, help="Client rpm limit, 0 = none")
+    parser.add_argument("--pages-per-request", type=int, default=1)
+    parser.add_argument("--cache", action="store_true", help="Use a fresh AI result cache")
+    parser.add_argument("--latency", type=float, default=0.5, help="Median seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.3)
+    parser.add_argument("--error-429", type=float, default=0.0, help="Injected 429 rate")
+    parser.add_argument("--timeouts", type=float, default=0.0, help="Injected timeout rate")
+    parser.add_argument("--malformed", type=float, default=0.0, help="Malformed JSON rate")
+    parser.add_argument("--server-concurrency", type=int, default=None)
+    parser.add_argument("--server-rpm", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="toll-bench-")
+    try:
+        folder = args.folder
+        if folder is None:
+            folder = os.path.join(work_dir, "pdfs")
+            os.makedirs(folder)
+            make_pdfs(folder, args.pages)
+
+        backend = FakeBackend(
+            latency_s=args.latency,
+            latency_sigma=args.latency_sigma,
+            error_429_rate=args.error_429,
+            timeout_rate=args.timeouts,
+            timeout_s=args.latency * 4,
+            malformed_rate=args.malformed,
+            max_concurrent=args.server_concurrency,
+            requests_per_minute=args.server_rpm,
+            seed=args.seed,
+        )
+        cache = AnalysisCache(os.path.join(work_dir, "cache.sqlite")) if args.cache else None
+        analyzer = TollAnalyzer(cache=cache, backend=backend, gate=RequestGate())
+        batch = BatchAnalyzer(
+            analyzer,
+            store=BatchResultsStore(os.path.join(work_dir, "results.jsonl")),
+            concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            backoff_base=0.5,
+            use_text_layer=False,
+            pages_per_request=args.pages_per_request,
+        )
+
+        start = time.monotonic()
+        stats = batch.run(folder)
+        elapsed = time.monotonic() - start
+        done = stats["analyzed"] + stats["failed"]
+
+        print(f"Pages: {done} in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.2f} pages/s)")
+        print(f"Batch: {stats}")
+        print(f"Gate: {analyzer.gate.metrics()}")
+        print(f"Responses: {analyzer.response_rates()}")
+        print(f"Fake server: {backend.stats}")
+        if cache is not None:
+            print(f"Cache: {cache.stats()}")
+            cache.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+"""
+Re-applies the standard cell styles to every row of the year's workbook.
+
+Usage:
+    python scripts/restyle_workbook.py [folder]
+
+Saves only style the rows they append; run this once to repair workbooks
+written by older versions or formatted by hand. Uses the configured export
+folder unless a folder is given and none is configured.
+"""
+import os
+import sys
+
+# Make the project packages importable when run from scripts/
+root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root_dir)
+
+from services.data_service import DataService
+
+
+def main():
+    folder = sys.argv[1] if len(sys.argv) > 1 else None
+    success, msg = DataService.restyle_workbook(folder)
+    print(msg)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+AI_CACHE_FILE = "ai_cache.sqlite"
+DEFAULT_MAX_ENTRIES = 20000
+DEFAULT_MAX_AGE_DAYS = 180
+
+
+class AnalysisCache:
+    """
+    On-disk cache of AI extraction results.
+
+    Entries are keyed by a hash of the rendered page pixels plus the model
+    name and prompt version, so the same page analyzed again (after a restart,
+    a revisit, or re-opening a folder) costs no API call.
+    """
+
+    def __init__(
+        self,
+        db_path=AI_CACHE_FILE,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        max_age_days=DEFAULT_MAX_AGE_DAYS,
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age_days = max_age_days
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                tolls TEXT NOT NULL,
+                total REAL NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(image_data, model, prompt_version):
+        """
+        Hashes the page pixels (PIL Image) or encoded bytes together with
+        the model and prompt version.
+        """
+        digest = hashlib.sha256()
+        if isinstance(image_data, (bytes, bytearray)):
+            digest.update(image_data)
+        else:
+            digest.update(f"{image_data.mode}:{image_data.size}".encode())
+            digest.update(image_data.tobytes())
+        digest.update(f"|{model}|{prompt_version}".encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Returns {"tolls", "total_calculated"} or None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tolls, total, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self._expired(row[2], now):
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE results SET last_used = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return {"tolls": json.loads(row[0]), "total_calculated": row[1]}
+
+    def put(self, key, result, model=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    model,
+                    json.dumps(result.get("tolls", [])),
+                    float(result.get("total_calculated", 0.0)),
+                    now,
+                    now,
+                ),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _expired(self, created_at, now):
+        return bool(self.max_age_days) and now - created_at > self.max_age_days * 86400
+
+    def _evict(self, now):
+        if self.max_age_days:
+            self._conn.execute(
+                "DELETE FROM results WHERE created_at < ?",
+                (now - self.max_age_days * 86400,),
+            )
+        if self.max_entries:
+            self._conn.execute(
+                """
+                DELETE FROM results WHERE key IN (
+                    SELECT key FROM results ORDER BY last_used DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
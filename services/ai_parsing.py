@@ -0,0 +1,200 @@
+import json
+import re
+from collections import OrderedDict
+
+from utils.amount_utils import parse_amount
+
+# Amounts parse_amount rejects that are still unambiguous: "5", "5.5", "$5,5".
+# A separator followed by three digits ("1.234") groups thousands in
+# bolivar amounts, so it is not read as a decimal point.
+SHORT_AMOUNT_PATTERN = re.compile(r"^\$?\s*(\d+)(?:[.,](\d{1,2}))?$")
+
+# Response schemas for schema-constrained JSON output
+TOLL_ITEM_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "amount": {"type": "NUMBER"},
+        "quantity": {"type": "INTEGER"},
+    },
+    "required": ["amount", "quantity"],
+}
+
+TOLLS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {"tolls": {"type": "ARRAY", "items": TOLL_ITEM_SCHEMA}},
+    "required": ["tolls"],
+}
+
+PAGES_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "pages": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "page_index": {"type": "INTEGER"},
+                    "tolls": {"type": "ARRAY", "items": TOLL_ITEM_SCHEMA},
+                },
+                "required": ["page_index", "tolls"],
+            },
+        }
+    },
+    "required": ["pages"],
+}
+
+
+def extract_json_object(text, required=()):
+    """
+    Returns the first valid JSON object in text, tolerating markdown fences
+    and stray prose around it. Objects missing any of the `required` keys
+    are skipped, so a truncated response does not yield one of its nested
+    entries. Raises ValueError if there is none.
+    """
+    if text is None:
+        raise ValueError("Empty response")
+    text = text.strip()
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict) and all(k in data for k in required):
+            return data
+    except ValueError:
+        pass
+
+    decoder = json.JSONDecoder()
+    start = text.find("{")
+    while start != -1:
+        try:
+            data, _ = decoder.raw_decode(text, start)
+            if isinstance(data, dict) and all(k in data for k in required):
+                return data
+        except ValueError:
+            pass
+        start = text.find("{", start + 1)
+    raise ValueError("No JSON object found in response")
+
+
+def to_amount(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        parsed = parse_amount(value)
+        if parsed is not None:
+            return parsed
+        match = SHORT_AMOUNT_PATTERN.match(value.strip())
+        if match is None:
+            return None
+        return float(f"{match.group(1)}.{match.group(2) or 0}")
+    return None
+
+
+def to_quantity(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        quantity = float(value)
+    except (TypeError, ValueError):
+        return None
+    if quantity != int(quantity):
+        return None
+    return int(quantity)
+
+
+def normalize_tolls(raw_tolls):
+    """
+    Type-checks toll entries and merges duplicate amounts.
+
+    Returns:
+        (list, int): Clean [{"amount": float, "quantity": int}] entries and
+        the number of entries that had to be dropped.
+    """
+    if not isinstance(raw_tolls, list):
+        return [], 1 if raw_tolls else 0
+
+    grouped = OrderedDict()
+    dropped = 0
+    for entry in raw_tolls:
+        if not isinstance(entry, dict):
+            dropped += 1
+            continue
+        amount = to_amount(entry.get("amount"))
+        quantity = to_quantity(entry.get("quantity", 1))
+        if amount is None or amount <= 0 or quantity is None or quantity <= 0:
+            dropped += 1
+            continue
+        amount = round(amount, 2)
+        grouped[amount] = grouped.get(amount, 0) + quantity
+
+    tolls = [{"amount": a, "quantity": q} for a, q in grouped.items()]
+    return tolls, dropped
+
+
+def total_of(tolls):
+    return sum(t["amount"] * t["quantity"] for t in tolls)
+
+
+class StreamingTollParser:
+    """
+    Incremental reader for a {"tolls": [...]} response arriving in chunks.
+    feed() returns the toll entries completed by the new text, normalized,
+    so they can be shown before the response is finished.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._pos = None  # Scan position inside the tolls array
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+        self._escaped = False
+        self._done = False
+
+    def feed(self, chunk):
+        self.text += chunk or ""
+        if self._done:
+            return []
+        if self._pos is None:
+            key = self.text.find('"tolls"')
+            if key == -1:
+                return []
+            bracket = self.text.find("[", key)
+            if bracket == -1:
+                return []
+            self._pos = bracket + 1
+
+        tolls = []
+        while self._pos < len(self.text):
+            char = self.text[self._pos]
+            self._pos += 1
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._start = self._pos - 1
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    tolls.extend(self._parse_entry(self.text[self._start : self._pos]))
+            elif char == "]" and self._depth == 0:
+                self._done = True
+                break
+        return tolls
+
+    @staticmethod
+    def _parse_entry(text):
+        try:
+            entry = json.loads(text)
+        except ValueError:
+            return []
+        tolls, _ = normalize_tolls([entry])
+        return tolls
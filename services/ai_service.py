@@ -1,29 +1,153 @@
 import json
 import os
+import threading
+import time
+from collections import deque
 
 from dotenv import load_dotenv
-from google import genai
+from google.genai import types
+
+from services.ai_parsing import (
+    PAGES_SCHEMA,
+    TOLLS_SCHEMA,
+    StreamingTollParser,
+    extract_json_object,
+    normalize_tolls,
+    total_of,
+)
+from services.gemini_client import get_client, get_gate
+from services.payload_service import (
+    encode_page_image,
+    options_signature,
+    payload_options,
+)
 
 load_dotenv()
 
+# Bump whenever the prompt changes so cached results are not reused
+PROMPT_VERSION = 2
+
+# Extra requests allowed when a response cannot be parsed
+PARSE_RETRIES = 1
+
+DEFAULT_MODEL = "gemini-flash-lite-latest"
+
+# Model list shown before (or without) a successful refresh from the API
+FALLBACK_MODELS = [DEFAULT_MODEL, "gemini-flash-latest", "gemini-pro-latest"]
+MODELS_CACHE_FILE = "models_cache.json"
+MODELS_CACHE_TTL_S = 24 * 3600
+
+# Cheapest/fastest model first; overridable through "ai_cascade" in config.json
+DEFAULT_CASCADE = {
+    "models": list(FALLBACK_MODELS),
+    # Plausible range for a single toll amount
+    "min_amount": 0.01,
+    "max_amount": 1000000.0,
+    # Estimated cost of one request per model, for reporting only
+    "cost_per_call": {},
+}
+
+
+TOLLS_PROMPT = """
+Analyze this image of a toll report.
+Identify all toll amounts found on the page.
+Group the tolls by their amount.
+
+Return ONLY a JSON response with this structure:
+{
+    "tolls": [
+        {"amount": 5.50, "quantity": 2},
+        {"amount": 3.00, "quantity": 5}
+    ]
+}
+Amounts are numbers with two decimals, quantities are whole numbers.
+If no tolls are found, return {"tolls": []}.
+"""
+
+
+def load_cached_models(path=MODELS_CACHE_FILE, ttl=MODELS_CACHE_TTL_S):
+    """
+    Reads the model list saved by refresh_model_cache().
+
+    Returns:
+        (list, bool): Cached models (FALLBACK_MODELS if there are none) and
+        whether they are younger than ttl seconds.
+    """
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        models = [str(m) for m in data["models"]]
+        fetched_at = float(data["fetched_at"])
+    except Exception:
+        return list(FALLBACK_MODELS), False
+    if not models:
+        return list(FALLBACK_MODELS), False
+    return models, time.time() - fetched_at < ttl
+
+
+def refresh_model_cache(path=MODELS_CACHE_FILE):
+    """
+    Fetches the model list from the API and saves it. Network bound; call it
+    off the Tk thread. Returns the models, or None if nothing was fetched.
+    """
+    try:
+        models = list_models()
+    except Exception as e:
+        print(f"Could not refresh model list: {e}")
+        return None
+    if not models:
+        return None
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            json.dump({"fetched_at": time.time(), "models": models}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not save model list: {e}")
+    return models
+
 
 def list_models() -> list:
     models = []
-    api_key = os.getenv("GEMINI_API_KEY")
-    if api_key:
-        client = genai.Client(api_key=os.environ.get("GOOGLE_API_KEY"))
-        for m in client.models.list():
+    client = get_client()
+    if client is not None:
+        for m in get_gate().call(lambda: list(client.models.list())):
             name = getattr(m, "name", None) or str(m)
             models.append(name.replace("models/", ""))
     return models
 
 
 class TollAnalyzer:
-    def __init__(self):
+    def __init__(self, cache=None, payload=None, cascade=None, gate=None, backend=None):
         self.api_key = os.getenv("GEMINI_API_KEY")
-        self.client = None
+        # Anything with genai.Client's `models` interface (see FakeBackend)
+        self.client = backend
+        # Concurrency/rate limits shared with every other Gemini caller
+        self.gate = gate if gate is not None else get_gate()
+        # Optional AnalysisCache of previous results
+        self.cache = cache
+        # Image encoding settings (see services.payload_service)
+        self.payload = payload_options(payload)
+        # Recent requests: encoded size and end-to-end latency
+        self.request_log = deque(maxlen=500)
+        # Counters for wasted calls (unparseable responses and their retries)
+        self.response_stats = {
+            "requests": 0,
+            "parse_failures": 0,
+            "retries": 0,
+            "dropped_entries": 0,
+        }
+        self._stats_lock = threading.Lock()
+        self.cascade = dict(DEFAULT_CASCADE)
+        if cascade:
+            self.cascade.update(cascade)
+        # model -> {"calls", "latency_s", "cost"}; plus cascade page counters
+        self.model_stats = {}
+        self.cascade_stats = {"pages": 0, "escalations": 0}
 
-        if self.api_key:
+        if backend is not None:
+            print(f"AI Service using {type(backend).__name__}")
+        elif self.api_key:
             # Debug: Print masked key to verify what is loaded
             masked = (
                 f"{self.api_key[:4]}...{self.api_key[-4:]}"
@@ -31,69 +155,434 @@ class TollAnalyzer:
                 else "****"
             )
             print(f"AI Service loaded Key: {masked}")
-
-            try:
-                self.client = genai.Client(api_key=self.api_key)
-            except Exception as e:
-                print(f"Failed to initialize GenAI Client: {e}")
+            self.client = get_client()
         else:
             print("Warning: GEMINI_API_KEY not found in environment.")
 
-    def analyze_page(self, image_data, model: str = "gemini-flash-lite-latest"):
+    def analyze_page(
+        self, image_data, model: str = DEFAULT_MODEL, use_cache=True
+    ):
         """
         Analyzes a PDF page image to extract toll data using Gemini.
 
         Args:
             image_data: PIL Image object of the PDF page.
+            use_cache: Look up and store the result in the AnalysisCache.
 
         Returns:
             dict: Extracted data (list of tolls, total amount).
         """
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self._cache_key(image_data, model)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                cached["cached"] = True
+                return cached
+
         if not self.client:
             return {"error": "API Key missing or Client init failed", "tolls": []}
 
         try:
-            prompt = """
-            Analyze this image of a toll report.
-            Identify all toll amounts found on the page.
-            Group the tolls by their amount.
-            
-            Return ONLY a JSON response with this structure:
-            {
-                "tolls": [
-                    {"amount": 5.50, "quantity": 2},
-                    {"amount": 3.00, "quantity": 5}
-                ]
-            }
-            Do not include markdown formatting (```json), just the raw JSON string.
-            If no tolls are found, return {"tolls": []}.
-            """
-
-            # New SDK call structure
-            # model='gemini-2.0-flash'
-            response = self.client.models.generate_content(
-                model=model,
-                contents=[prompt, image_data],
+            # Latency is end to end, image encoding included
+            start = time.monotonic()
+            payload, mime_type = encode_page_image(image_data, self.payload)
+            contents = [
+                TOLLS_PROMPT,
+                types.Part.from_bytes(data=payload, mime_type=mime_type),
+            ]
+            data = self._generate_json(
+                model, contents, TOLLS_SCHEMA, len(payload), mime_type, start=start
             )
 
-            text = response.text.strip()
+            tolls, dropped = normalize_tolls(data.get("tolls", []))
+            self._count("dropped_entries", dropped)
 
-            # Clean up potential markdown code blocks
-            if text.startswith("```"):
-                text = text.replace("```json", "").replace("```", "")
+            # Calculate total locally
+            total = total_of(tolls)
 
-            data = json.loads(text)
+            result = {"tolls": tolls, "total_calculated": total}
+            if cache_key is not None:
+                self.cache.put(cache_key, result, model=model)
+            return result
 
-            # Calculate total locally
-            tolls = data.get("tolls", [])
-            total = sum(t.get("amount", 0) * t.get("quantity", 0) for t in tolls)
+        except Exception as e:
+            print(f"AI Analysis failed: {e}")
+            return {"error": str(e), "tolls": []}
 
-            return {"tolls": tolls, "total_calculated": total}
+    def analyze_page_stream(
+        self,
+        image_data,
+        model: str = DEFAULT_MODEL,
+        on_toll=None,
+        use_cache=True,
+        on_restart=None,
+    ):
+        """
+        Like analyze_page, but streams the response and calls on_toll(toll)
+        for every entry as soon as it has been generated. on_toll runs on
+        the calling thread. Entries are passed as they come; the returned
+        result has duplicates merged. If a quota error interrupts the stream
+        and the request is retried, on_restart() is called first, as the
+        entries are then passed again from the start.
+        """
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = self._cache_key(image_data, model)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                cached["cached"] = True
+                if on_toll is not None:
+                    for toll in cached.get("tolls", []):
+                        on_toll(toll)
+                return cached
+
+        if not self.client:
+            return {"error": "API Key missing or Client init failed", "tolls": []}
+
+        try:
+            start = time.monotonic()
+            payload, mime_type = encode_page_image(image_data, self.payload)
+            contents = [
+                TOLLS_PROMPT,
+                types.Part.from_bytes(data=payload, mime_type=mime_type),
+            ]
+            config = types.GenerateContentConfig(
+                response_mime_type="application/json", response_schema=TOLLS_SCHEMA
+            )
+
+            emitted = []
+
+            def consume():
+                if emitted and on_restart is not None:
+                    on_restart()
+                del emitted[:]
+                parser = StreamingTollParser()
+                for chunk in self.client.models.generate_content_stream(
+                    model=model, contents=contents, config=config
+                ):
+                    for toll in parser.feed(chunk.text):
+                        emitted.append(toll)
+                        if on_toll is not None:
+                            on_toll(toll)
+                return parser.text
+
+            try:
+                # The whole stream holds one gate slot
+                text = self.gate.call(consume)
+            finally:
+                self._log_request(model, len(payload), mime_type, start)
+            self._count("requests")
+
+            try:
+                data = extract_json_object(text, TOLLS_SCHEMA["required"])
+            except ValueError:
+                self._count("parse_failures")
+                self._count("retries")
+                # Rows already shown are replaced by the non-streamed answer
+                return self.analyze_page(image_data, model=model, use_cache=use_cache)
+
+            tolls, dropped = normalize_tolls(data.get("tolls", []))
+            self._count("dropped_entries", dropped)
+            result = {"tolls": tolls, "total_calculated": total_of(tolls)}
+            if cache_key is not None:
+                self.cache.put(cache_key, result, model=model)
+            return result
 
         except Exception as e:
             print(f"AI Analysis failed: {e}")
             return {"error": str(e), "tolls": []}
 
+    def analyze_cascade(self, image_data, models=None, text_total=None):
+        """
+        Runs the cheapest model first and escalates to the next model only
+        when the result fails check_result().
+
+        Args:
+            image_data: PIL Image object of the PDF page.
+            models: Models to try in order (defaults to the configured cascade).
+            text_total: Page total read from the text layer, if any.
+
+        Returns:
+            dict: Result of the first model that passed (or the last one tried),
+            with "model" and "escalations" added.
+        """
+        models = models or self.cascade["models"]
+        if not models:
+            return {"error": "No models configured", "tolls": []}
+        escalations = 0
+        for i, model in enumerate(models):
+            start = time.monotonic()
+            result = self.analyze_page(image_data, model=model)
+            self._record_model_call(model, time.monotonic() - start, result)
+
+            ok, reason = self.check_result(result, text_total)
+            if ok:
+                break
+            if i < len(models) - 1:
+                escalations += 1
+                print(f"Escalating from {model}: {reason}")
+        else:
+            result["low_confidence"] = True
+
+        with self._stats_lock:
+            self.cascade_stats["pages"] += 1
+            self.cascade_stats["escalations"] += escalations
+        result["model"] = model
+        result["escalations"] = escalations
+        return result
+
+    def check_result(self, result, text_total=None):
+        """
+        Cheap plausibility check of an extraction.
+
+        Returns:
+            (bool, str): Whether the result is acceptable and why not.
+        """
+        if "error" in result:
+            return False, result["error"]
+        tolls = result.get("tolls", [])
+        if not tolls:
+            return False, "no tolls found"
+        low, high = self.cascade["min_amount"], self.cascade["max_amount"]
+        for t in tolls:
+            if not low <= t["amount"] <= high:
+                return False, f"implausible amount {t['amount']}"
+        if text_total is not None:
+            if abs(result.get("total_calculated", 0.0) - text_total) >= 0.01:
+                return False, f"total differs from text layer ({text_total:.2f})"
+        return True, ""
+
+    def _record_model_call(self, model, latency, result):
+        cost = 0.0 if result.get("cached") else self.cascade["cost_per_call"].get(model, 0.0)
+        with self._stats_lock:
+            stats = self.model_stats.setdefault(
+                model, {"calls": 0, "latency_s": 0.0, "cost": 0.0}
+            )
+            stats["calls"] += 1
+            stats["latency_s"] += latency
+            stats["cost"] += cost
+
+    def cascade_report(self):
+        """Per-model average latency, escalation rate and cost per page."""
+        with self._stats_lock:
+            pages = self.cascade_stats["pages"]
+            models = {
+                model: {
+                    "calls": s["calls"],
+                    "avg_latency_s": s["latency_s"] / s["calls"],
+                    "cost": s["cost"],
+                }
+                for model, s in self.model_stats.items()
+                if s["calls"]
+            }
+            total_cost = sum(s["cost"] for s in self.model_stats.values())
+            return {
+                "pages": pages,
+                "escalation_rate": self.cascade_stats["escalations"] / pages if pages else 0.0,
+                "cost_per_page": total_cost / pages if pages else 0.0,
+                "models": models,
+            }
+
+    def analyze_pages(
+        self,
+        images,
+        model: str = DEFAULT_MODEL,
+        use_cache=True,
+        retry_failed=True,
+    ):
+        """
+        Analyzes several page images in a single Gemini request.
+
+        The fixed request latency and prompt tokens are paid once for the
+        whole group. Pages missing from, or malformed in, the response are
+        retried one by one with analyze_page (unless retry_failed is False,
+        in which case they come back with an "error").
+
+        Args:
+            images: List of PIL Image objects.
+
+        Returns:
+            list: One result dict per image, in the same order.
+        """
+        results = [None] * len(images)
+        cache_keys = [None] * len(images)
+        pending = []
+        for i, img in enumerate(images):
+            if self.cache is not None and use_cache:
+                cache_keys[i] = self._cache_key(img, model)
+                cached = self.cache.get(cache_keys[i])
+                if cached is not None:
+                    cached["cached"] = True
+                    results[i] = cached
+                    continue
+            pending.append(i)
+
+        if pending and not self.client:
+            for i in pending:
+                results[i] = {"error": "API Key missing or Client init failed", "tolls": []}
+            return results
+
+        if len(pending) == 1:
+            results[pending[0]] = self.analyze_page(
+                images[pending[0]], model=model, use_cache=use_cache
+            )
+            return results
+
+        if pending:
+            try:
+                by_index = self._request_batch([images[i] for i in pending], model)
+            except Exception as e:
+                print(f"AI batch analysis failed: {e}")
+                by_index = {}
+
+            for batch_idx, i in enumerate(pending):
+                tolls = by_index.get(batch_idx)
+                if tolls is None:
+                    if retry_failed:
+                        results[i] = self.analyze_page(
+                            images[i], model=model, use_cache=use_cache
+                        )
+                    else:
+                        results[i] = {"error": "Missing from batch response", "tolls": []}
+                    continue
+
+                results[i] = {"tolls": tolls, "total_calculated": total_of(tolls)}
+                if cache_keys[i] is not None:
+                    self.cache.put(cache_keys[i], results[i], model=model)
+
+        return results
+
+    def _request_batch(self, images, model):
+        """
+        Sends images in one request. Returns {page_index: tolls} for every
+        page whose entry in the response was well formed.
+        """
+        prompt = f"""
+        You will receive {len(images)} images of toll report pages, in order.
+        Their page_index values are 0 to {len(images) - 1}.
+        For each page, identify all toll amounts and group the tolls by amount.
+
+        Return ONLY a JSON response with this structure:
+        {{
+            "pages": [
+                {{"page_index": 0, "tolls": [{{"amount": 5.50, "quantity": 2}}]}},
+                {{"page_index": 1, "tolls": []}}
+            ]
+        }}
+        Include one entry per page. Do not include markdown formatting.
+        """
+
+        contents = [prompt]
+        total_bytes = 0
+        start = time.monotonic()
+        for idx, img in enumerate(images):
+            payload, mime_type = encode_page_image(img, self.payload)
+            total_bytes += len(payload)
+            contents.append(f"page_index {idx}:")
+            contents.append(types.Part.from_bytes(data=payload, mime_type=mime_type))
+
+        data = self._generate_json(
+            model,
+            contents,
+            PAGES_SCHEMA,
+            total_bytes,
+            mime_type,
+            pages=len(images),
+            start=start,
+        )
+
+        by_index = {}
+        for entry in data.get("pages", []):
+            try:
+                idx = int(entry["page_index"])
+                raw_tolls = entry["tolls"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not isinstance(raw_tolls, list) or not 0 <= idx < len(images):
+                continue
+            tolls, dropped = normalize_tolls(raw_tolls)
+            self._count("dropped_entries", dropped)
+            if raw_tolls and dropped == len(raw_tolls):
+                continue  # Nothing usable, retry this page on its own
+            by_index[idx] = tolls
+        return by_index
+
+    def _generate_json(
+        self, model, contents, schema, size, mime_type, pages=1, start=None
+    ):
+        """
+        Requests schema-constrained JSON and returns the parsed object.
+        An unparseable response is retried up to PARSE_RETRIES times.
+        start is when the caller began encoding the request, so the first
+        attempt's logged latency includes the encoding.
+        """
+        config = types.GenerateContentConfig(
+            response_mime_type="application/json", response_schema=schema
+        )
+        for attempt in range(PARSE_RETRIES + 1):
+            if attempt or start is None:
+                start = time.monotonic()
+            try:
+                response = self.gate.call(
+                    self.client.models.generate_content,
+                    model=model,
+                    contents=contents,
+                    config=config,
+                )
+            finally:
+                self._log_request(model, size, mime_type, start, pages=pages)
+            self._count("requests")
+
+            try:
+                return extract_json_object(response.text, schema["required"])
+            except ValueError:
+                self._count("parse_failures")
+                if attempt == PARSE_RETRIES:
+                    raise
+                self._count("retries")
+
+    def _count(self, name, amount=1):
+        if amount:
+            with self._stats_lock:
+                self.response_stats[name] += amount
+
+    def response_rates(self):
+        """Parse-failure and retry rates over all requests so far."""
+        with self._stats_lock:
+            stats = dict(self.response_stats)
+        requests = stats["requests"]
+        stats["parse_failure_rate"] = stats["parse_failures"] / requests if requests else 0.0
+        stats["retry_rate"] = stats["retries"] / requests if requests else 0.0
+        return stats
+
+    def _cache_key(self, image_data, model):
+        return self.cache.make_key(
+            image_data, model, f"{PROMPT_VERSION}|{options_signature(self.payload)}"
+        )
+
+    def _log_request(self, model, size, mime_type, start, pages=1):
+        self.request_log.append(
+            {
+                "model": model,
+                "bytes": size,
+                "pages": pages,
+                "mime_type": mime_type,
+                "latency_s": time.monotonic() - start,
+            }
+        )
+
+    def payload_stats(self):
+        """Average encoded size and latency of the logged requests."""
+        log = list(self.request_log)
+        if not log:
+            return {"requests": 0}
+        return {
+            "requests": len(log),
+            "avg_bytes": sum(r["bytes"] for r in log) / len(log),
+            "avg_latency_s": sum(r["latency_s"] for r in log) / len(log),
+        }
+
     def verify_calculation(self, extracted_data, user_total):
         """
         Compares AI extracted total with user provided total.
@@ -0,0 +1,300 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from services.document_pool import DocumentPool
+from services.pdf_service import render_page_pnm
+from services.rate_limit import TokenBucket
+from services.text_service import extract_tolls_from_page
+from utils.sort_utils import natural_keys
+
+BATCH_RESULTS_FILE = "batch_results.jsonl"
+
+# Substrings of error messages worth retrying (quota, overload, network)
+TRANSIENT_ERRORS = (
+    "429",
+    "500",
+    "503",
+    "RESOURCE_EXHAUSTED",
+    "UNAVAILABLE",
+    "DEADLINE_EXCEEDED",
+    "timed out",
+    "timeout",
+    "Connection",
+)
+
+
+def is_transient_error(message):
+    message = str(message)
+    return any(marker.lower() in message.lower() for marker in TRANSIENT_ERRORS)
+
+
+class BatchResultsStore:
+    """
+    Append-only JSONL file of per-page results. Pages with a stored result
+    are skipped on the next run, so an interrupted batch resumes where it
+    stopped. Failed pages are recorded with an "error" and retried.
+    Pages are identified by full PDF path, as file names repeat from one
+    month's folder to the next.
+    """
+
+    def __init__(self, path=BATCH_RESULTS_FILE):
+        self.path = path
+        self.completed = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line from a crash
+                    if "error" not in record:
+                        self.completed.add(self._key(record["path"], record["page"]))
+
+    @staticmethod
+    def _key(path, page_number):
+        return os.path.normcase(os.path.abspath(path)), page_number
+
+    def is_done(self, path, page_number):
+        return self._key(path, page_number) in self.completed
+
+    def append(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            if "error" not in record:
+                self.completed.add(self._key(record["path"], record["page"]))
+
+
+class BatchAnalyzer:
+    """
+    Headless pipeline that analyzes every page of every PDF in a folder.
+
+    Pages are rendered on the calling thread (fitz is not thread-safe) and
+    handed to a pool of analysis workers. Requests are capped both in
+    concurrency and in requests per minute; transient failures are retried
+    with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        analyzer,
+        store=None,
+        model=None,
+        concurrency=4,
+        requests_per_minute=60,
+        max_retries=4,
+        backoff_base=2.0,
+        zoom=2.0,
+        use_text_layer=True,
+        pages_per_request=1,
+    ):
+        self.analyzer = analyzer
+        self.store = store if store is not None else BatchResultsStore()
+        self.model = model
+        self.concurrency = max(1, int(concurrency))
+        # Analyzers on the shared Gemini gate are limited (and back off on
+        # quota errors) there; anything else gets a private token bucket
+        self.gate = getattr(analyzer, "gate", None)
+        if self.gate is not None:
+            self.gate.configure(
+                max_concurrent=self.concurrency, requests_per_minute=requests_per_minute
+            )
+            self.rate_limiter = None
+        else:
+            self.rate_limiter = TokenBucket(requests_per_minute)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        # Same zoom as the GUI so results also land in its AI result cache
+        self.zoom = zoom
+        self.use_text_layer = use_text_layer
+        # More than 1 sends several pages per Gemini request
+        self.pages_per_request = max(1, int(pages_per_request))
+        self.stats = {
+            "analyzed": 0,
+            "from_text": 0,
+            "skipped": 0,
+            "failed": 0,
+            "retries": 0,
+        }
+        self._stop = threading.Event()
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name):
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def _throttle(self):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+    @staticmethod
+    def list_pdfs(folder):
+        files = [f for f in os.listdir(folder) if f.lower().endswith(".pdf")]
+        files.sort(key=natural_keys)
+        return [os.path.join(folder, f) for f in files]
+
+    def stop(self):
+        """Stops submitting new pages; in-flight pages still finish."""
+        self._stop.set()
+
+    def run(self, folder, progress=None):
+        """
+        Analyzes all pending pages under folder. progress(record) is called
+        for every finished page. Returns the stats dict.
+        """
+        pool = DocumentPool(max_size=2)
+        in_flight = set()
+        group = []
+        executor = ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="batch-analysis"
+        )
+
+        def submit(pages):
+            if len(pages) == 1:
+                in_flight.add(executor.submit(self._analyze, *pages[0], progress))
+            else:
+                in_flight.add(executor.submit(self._analyze_group, pages, progress))
+
+        try:
+            for path in self.list_pdfs(folder):
+                if self._stop.is_set():
+                    break
+                pdf_name = os.path.basename(path)
+                try:
+                    doc = pool.acquire(path)
+                except Exception as e:
+                    print(f"Skipping {pdf_name}: {e}")
+                    continue
+
+                for page_idx in range(doc.page_count):
+                    if self._stop.is_set():
+                        break
+                    if self.store.is_done(path, page_idx + 1):
+                        self._count("skipped")
+                        continue
+
+                    # Keep at most two requests per worker rendered in memory
+                    while len(in_flight) >= self.concurrency * 2:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        in_flight -= done
+
+                    if self.use_text_layer and self._store_text_result(
+                        path, doc, page_idx, progress
+                    ):
+                        continue
+
+                    img = render_page_pnm(doc, page_idx, self.zoom).to_image()
+                    group.append((path, page_idx, img))
+                    if len(group) >= self.pages_per_request:
+                        submit(group)
+                        group = []
+            if group:
+                submit(group)
+            wait(in_flight)
+        finally:
+            executor.shutdown(wait=True)
+            pool.close_all()
+        return self.stats
+
+    def _store_text_result(self, path, doc, page_idx, progress):
+        """Stores the page from its text layer; False if the AI is needed."""
+        try:
+            result = extract_tolls_from_page(doc.load_page(page_idx))
+        except Exception:
+            result = None
+        if result is None:
+            return False
+
+        record = {
+            "pdf": os.path.basename(path),
+            "page": page_idx + 1,
+            "path": path,
+            "model": "text-layer",
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "tolls": result["tolls"],
+            "total_calculated": result["total_calculated"],
+        }
+        self._count("from_text")
+        self.store.append(record)
+        if progress is not None:
+            progress(record)
+        return True
+
+    def _analyze_group(self, pages, progress):
+        """
+        Analyzes several pages in one request. Pages that fail in the
+        combined response are retried individually via _analyze.
+        """
+        self._throttle()
+        start = time.monotonic()
+        images = [img for _, _, img in pages]
+        if self.model:
+            results = self.analyzer.analyze_pages(
+                images, model=self.model, retry_failed=False
+            )
+        else:
+            results = self.analyzer.analyze_pages(images, retry_failed=False)
+        latency = (time.monotonic() - start) / len(pages)
+
+        for (path, page_idx, img), result in zip(pages, results):
+            if result.get("error"):
+                self._analyze(path, page_idx, img, progress)
+            else:
+                self._store_result(path, page_idx, result, latency, progress)
+
+    def _analyze(self, path, page_idx, img, progress):
+        pdf_name = os.path.basename(path)
+        attempt = 0
+        while True:
+            self._throttle()
+            start = time.monotonic()
+            if self.model:
+                result = self.analyzer.analyze_page(img, model=self.model)
+            else:
+                result = self.analyzer.analyze_page(img)
+            latency = time.monotonic() - start
+
+            error = result.get("error")
+            if not error or attempt >= self.max_retries or not is_transient_error(error):
+                break
+            attempt += 1
+            self._count("retries")
+            # Exponential backoff with jitter so workers do not retry in lockstep
+            delay = self.backoff_base ** attempt * (0.5 + random.random())
+            print(f"{pdf_name} page {page_idx + 1}: {error} (retry {attempt} in {delay:.1f}s)")
+            time.sleep(delay)
+
+        return self._store_result(path, page_idx, result, latency, progress)
+
+    def _store_result(self, path, page_idx, result, latency, progress):
+        error = result.get("error")
+        record = {
+            "pdf": os.path.basename(path),
+            "page": page_idx + 1,
+            "path": path,
+            "model": self.model,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "latency_s": round(latency, 3),
+        }
+        if error:
+            record["error"] = str(error)
+            self._count("failed")
+        else:
+            record["tolls"] = result.get("tolls", [])
+            record["total_calculated"] = result.get("total_calculated", 0.0)
+            record["cached"] = bool(result.get("cached"))
+            self._count("analyzed")
+
+        self.store.append(record)
+        if progress is not None:
+            progress(record)
+        return record
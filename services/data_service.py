@@ -1,12 +1,24 @@
 import json
 import os
+import threading
 from datetime import datetime
 
-import pandas as pd
+from services.journal_service import JOURNAL_FILE, TollJournal
+from services.toll_index import get_index
 
 # EXCEL_FILENAME removed, generating dynamically
 CONFIG_FILE = "config.json"
 
+_journal = None
+# Guards _journal and the assignment of sequence numbers
+_state_lock = threading.RLock()
+# One workbook writer at a time (background flush, shutdown, restyle)
+_materialize_lock = threading.RLock()
+
+# Named styles registered once per workbook and shared by all cells
+CELL_STYLE = "Toll Cell"
+HEADER_STYLE = "Toll Header"
+
 
 class DataService:
     @staticmethod
@@ -42,22 +54,35 @@ class DataService:
         return os.path.join(base_folder, filename), filename
 
     @staticmethod
-    def save_toll_entry(folder_path, data):
+    def get_journal():
+        """Returns the process-wide journal of unmaterialized saves."""
+        global _journal
+        with _state_lock:
+            if _journal is None:
+                _journal = TollJournal(JOURNAL_FILE)
+            return _journal
+
+    @staticmethod
+    def save_toll_entry(folder_path, data, materialize=True):
         """
-        Saves a toll entry to the Excel file in the specified folder.
-        Creates the file if it doesn't exist.
+        Saves a toll entry for the Excel file in the specified folder.
         The filename contains the current year (e.g., "Peajes 2026 Calculo.xlsx").
         Format:
         Row 1: Calculo peajes [Year]
         Row 2: Numero de Peajes | Total en BS
         Following rows: Sequential numbering | Amount
 
+        The entry is first appended to the journal, which makes the save
+        durable in O(1). With materialize=False the workbook is only
+        updated by a later materialize() call (the GUI does this in the
+        background and at shutdown).
+
         Args:
             folder_path (str): Default directory if no export folder is configured.
             data (dict): Dictionary containing row data (PDF Name, Page, Amount, etc.)
+            materialize (bool): Also write the workbook before returning.
         """
         file_path, filename = DataService.get_excel_path(folder_path)
-        current_year = datetime.now().year
 
         # Add timestamp
         data["Timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -73,297 +98,393 @@ class DataService:
         except (ValueError, TypeError):
             data["Total Amount"] = 0.0
 
-        try:
-            # 1. Determine next sequence number
-            next_num = 1
-            if os.path.exists(file_path):
-                try:
-                    df_calc = pd.read_excel(file_path, sheet_name="Calculo", skiprows=1)
-                    if not df_calc.empty:
-                        last_num = df_calc.iloc[:, 0].max()
-                        if pd.notna(last_num):
-                            next_num = int(last_num) + 1
-                except Exception:
-                    next_num = 1
-
-            # 2. Prepare data for Detalle sheet
-            # Add sequential 'No.' as the first column
-            detail_data = {"No.": next_num}
-            detail_data.update(data)
-            df_detail_new = pd.DataFrame([detail_data])
-
-            # 3. Prepare data for Calculo sheet
-            df_summary_new = pd.DataFrame(
-                {
-                    "Numero de Peajes": [next_num],
-                    "Total en BS": [data.get("Total Amount", 0)],
-                }
-            )
-
-            # 4. Write to Excel
-            if os.path.exists(file_path):
-                with pd.ExcelWriter(
-                    file_path, mode="a", engine="openpyxl", if_sheet_exists="overlay"
-                ) as writer:
-                    # Write Summary (Calculo)
-                    start_row_summary = 0
-                    try:
-                        writer.book["Calculo"]
-                        start_row_summary = writer.book["Calculo"].max_row
-                        df_summary_new.to_excel(
-                            writer,
-                            sheet_name="Calculo",
-                            index=False,
-                            header=False,
-                            startrow=start_row_summary,
-                        )
-                    except KeyError:
-                        # Create sheet if it somehow disappeared but file exists
-                        title_df = pd.DataFrame([[f"Calculo peajes {current_year}"]])
-                        title_df.to_excel(
-                            writer, sheet_name="Calculo", index=False, header=False
-                        )
-                        df_summary_new.to_excel(
-                            writer,
-                            sheet_name="Calculo",
-                            index=False,
-                            header=True,
-                            startrow=1,
-                        )
-
-                    # Write Detalle (Detalle)
-                    start_row_detail = 0
-                    try:
-                        writer.book["Detalle"]
-                        start_row_detail = writer.book["Detalle"].max_row
-                        df_detail_new.to_excel(
-                            writer,
-                            sheet_name="Detalle",
-                            index=False,
-                            header=False,
-                            startrow=start_row_detail,
-                        )
-                    except KeyError:
-                        df_detail_new.to_excel(
-                            writer, sheet_name="Detalle", index=False, header=True
-                        )
-
-                    # Apply styling (Centering and Borders)
-                    from openpyxl.styles import Alignment, Border, Side
-                    thin_border = Border(
-                        left=Side(style="thin"),
-                        right=Side(style="thin"),
-                        top=Side(style="thin"),
-                        bottom=Side(style="thin"),
-                    )
-
-                    # Style Calculo sheet (headers on row 2)
-                    ws_calc = writer.book["Calculo"]
-                    for row in ws_calc.iter_rows(min_row=2):
-                        for cell in row:
-                            cell.alignment = Alignment(horizontal="center")
-                            cell.border = thin_border
-
-                    # Style Detalle sheet (headers on row 1)
-                    ws_detail = writer.book["Detalle"]
-                    for row in ws_detail.iter_rows(min_row=1):
-                        for cell in row:
-                            cell.alignment = Alignment(horizontal="center")
-                            cell.border = thin_border
-            else:
-                # Create new file
-                with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
-                    # Title row
-                    title_df = pd.DataFrame([[f"Calculo peajes {current_year}"]])
-                    title_df.to_excel(
-                        writer, sheet_name="Calculo", index=False, header=False
-                    )
-
-                    # Summary
-                    df_summary_new.to_excel(
-                        writer,
-                        sheet_name="Calculo",
-                        index=False,
-                        header=True,
-                        startrow=1,
-                    )
-
-                    # Detail
-                    df_detail_new.to_excel(
-                        writer, sheet_name="Detalle", index=False, header=True
-                    )
-
-                    # Apply styling (Centering and Borders)
-                    from openpyxl.styles import Alignment, Border, Side
-                    thin_border = Border(
-                        left=Side(style="thin"),
-                        right=Side(style="thin"),
-                        top=Side(style="thin"),
-                        bottom=Side(style="thin"),
-                    )
-
-                    # Style Calculo sheet
-                    ws_calc = writer.book["Calculo"]
-                    for row in ws_calc.iter_rows(min_row=2):  # Header and data
-                        for cell in row:
-                            cell.alignment = Alignment(horizontal="center")
-                            cell.border = thin_border
-
-                    # Style Detalle sheet
-                    ws_detail = writer.book["Detalle"]
-                    for row in ws_detail.iter_rows(min_row=1):  # Header and data
-                        for cell in row:
-                            cell.alignment = Alignment(horizontal="center")
-                            cell.border = thin_border
-
-            return True, f"Saved to {filename}"
+        export_dir = os.path.dirname(file_path)
+        if export_dir and not os.path.isdir(export_dir):
+            # Do not journal entries for a workbook that can never be written
+            return False, f"Export folder not found: {export_dir}"
 
+        try:
+            journal = DataService.get_journal()
+            with _state_lock:
+                next_num = DataService._next_number(file_path)
+                journal.append(
+                    {"op": "save", "excel": file_path, "no": next_num, "data": data}
+                )
         except Exception as e:
             import traceback
 
             traceback.print_exc()
-            print(f"Error saving to Excel: {e}")
+            print(f"Error saving toll entry: {e}")
             return False, str(e)
 
+        if materialize:
+            success, msg = DataService.materialize(folder_path)
+            if not success:
+                # The entry is safe in the journal and is retried later
+                return True, f"Saved #{next_num} (Excel update pending: {msg})"
+        return True, f"Saved to {filename}"
+
     @staticmethod
-    def has_toll_entry(pdf_name, page_number, folder_path=None):
+    def _next_number(file_path):
         """
-        Returns True if an entry exists in the Detalle sheet for the given PDF + page.
+        Next sequence number for the workbook, from the workbook index and
+        the journal. Call with _state_lock held.
         """
-        file_path, _ = DataService.get_excel_path(folder_path)
-        if not os.path.exists(file_path):
-            return False
-        try:
-            df = pd.read_excel(file_path, sheet_name="Detalle")
-            mask = (df["PDF Name"].astype(str) == str(pdf_name)) & \
-                   (df["Page Number"].astype(int) == int(page_number))
-            return mask.any()
-        except Exception:
-            return False
+        last_num = DataService._index(file_path).last_number
+        for record in DataService._pending_saves(file_path):
+            last_num = max(last_num, record["no"])
+        return last_num + 1
 
     @staticmethod
-    def delete_toll_entry(pdf_name, page_number, folder_path=None):
+    def _index(file_path):
         """
-        Deletes a toll entry from the Excel file by matching PDF Name and Page Number.
-        Removes the corresponding row from both 'Detalle' and 'Calculo' sheets.
-        Does NOT renumber remaining entries (toll numbers map to physical paper).
+        The workbook index with journaled deletes applied, i.e. the
+        workbook as it will be once materialized.
+        """
+        index = get_index(file_path)
+        if index.deleted is None:
+            index.mark_deleted(
+                r["no"]
+                for r in DataService.get_journal().pending(file_path)
+                if r.get("op") == "delete"
+            )
+        return index
+
+    @staticmethod
+    def _pending_saves(file_path):
+        """Journaled saves for the workbook that no later delete cancelled."""
+        saves = {}
+        for record in DataService.get_journal().pending(file_path):
+            if record.get("op") == "delete":
+                saves.pop(record["no"], None)
+            else:
+                saves[record["no"]] = record
+        return list(saves.values())
+
+    @staticmethod
+    def materialize(folder_path=None):
+        """
+        Writes journaled entries to the Excel workbook and removes them from
+        the journal. Safe to call from a background thread; entries stay in
+        the journal if the workbook cannot be written (e.g. open in Excel).
 
         Returns:
             (bool, str): Success flag and message.
         """
-        from openpyxl import load_workbook
-        from openpyxl.styles import Alignment, Border, Side
+        file_path, _ = DataService.get_excel_path(folder_path)
+        return DataService._materialize_file(file_path)
 
-        file_path, filename = DataService.get_excel_path(folder_path)
+    @staticmethod
+    def materialize_all():
+        """Materializes every workbook with pending entries (e.g. at shutdown)."""
+        excel_paths = {r["excel"] for r in DataService.get_journal().pending()}
+        return [DataService._materialize_file(path) for path in sorted(excel_paths)]
 
-        if not os.path.exists(file_path):
-            return False, "Excel file not found."
+    @staticmethod
+    def _materialize_file(file_path):
+        filename = os.path.basename(file_path)
+        with _materialize_lock:
+            journal = DataService.get_journal()
+            records = journal.pending(file_path)
+            if not records:
+                return True, "Nothing to write."
+            # Catch up with outside edits before our rows are added to it
+            index = DataService._index(file_path)
+            tmp_path = file_path + ".tmp"
+            try:
+                appended, removed, index_off = DataService._apply_records(
+                    file_path, records, tmp_path
+                )
+                # Our own write must not look like an external change
+                index.apply_write(
+                    lambda: os.replace(tmp_path, file_path),
+                    added=appended,
+                    removed=removed,
+                )
+                if index_off:
+                    # Rows were not where the index said; parse the file again
+                    index.invalidate()
+            except Exception as e:
+                import traceback
 
-        try:
-            # Read Detalle to find the matching row
-            df_detail = pd.read_excel(file_path, sheet_name="Detalle")
+                traceback.print_exc()
+                print(f"Error writing to Excel: {e}")
+                return False, str(e)
+            journal.discard(r["seq"] for r in records)
+        return True, f"Wrote {len(records)} entries to {filename}"
 
-            # Find matching row(s)
-            mask = (df_detail["PDF Name"].astype(str) == str(pdf_name)) & \
-                   (df_detail["Page Number"].astype(int) == int(page_number))
+    @staticmethod
+    def _apply_records(file_path, records, out_path):
+        """
+        Applies journal records, in order, to both sheets in a single load
+        and saves the result to out_path, for the caller to swap in. Saves
+        append rows; deletes remove rows in place, leaving everything else
+        (formatting included) untouched.
+
+        Returns (appended, removed, index_off): (No., PDF Name, Page Number,
+        Detalle row, Calculo row) for each row written, the deleted toll
+        numbers, and whether a deleted row was not at its indexed position.
+        """
+        from openpyxl import Workbook, load_workbook
 
-            matches = df_detail[mask]
-            if matches.empty:
-                return False, f"No entry found for '{pdf_name}' page {page_number}."
+        current_year = datetime.now().year
+        if os.path.exists(file_path):
+            wb = load_workbook(file_path)
+        else:
+            wb = Workbook()
+            wb.remove(wb.active)
+
+        if "Calculo" not in wb.sheetnames:
+            ws_calc = wb.create_sheet("Calculo", 0)
+            ws_calc.append([f"Calculo peajes {current_year}"])
+            ws_calc.append(["Numero de Peajes", "Total en BS"])
+            DataService._style_rows(ws_calc, 2, 2, HEADER_STYLE)
+        ws_calc = wb["Calculo"]
+
+        if "Detalle" not in wb.sheetnames:
+            first_data = next((r["data"] for r in records if "data" in r), {})
+            ws_detail = wb.create_sheet("Detalle")
+            ws_detail.append(["No."] + list(first_data.keys()))
+            DataService._style_rows(ws_detail, 1, 1, HEADER_STYLE)
+        ws_detail = wb["Detalle"]
+        headers = [cell.value for cell in ws_detail[1]]
+
+        # Numbers already in the workbook were written before a crash that
+        # happened between saving the workbook and trimming the journal
+        written = {
+            value
+            for (value,) in ws_calc.iter_rows(min_row=3, max_col=1, values_only=True)
+        }
+        appended = []
+        removed = []
+        index_off = False
+        for record in records:
+            if record.get("op") == "delete":
+                number = record["no"]
+                hints = record.get("rows") or (None, None)
+                for pos, (ws, first_row) in enumerate(
+                    ((ws_detail, 2), (ws_calc, 3))
+                ):
+                    row = DataService._find_row(ws, number, hints[pos], first_row)
+                    if hints[pos] and row != hints[pos]:
+                        index_off = True
+                    if row is None:
+                        continue
+                    ws.delete_rows(row)
+                    # Rows appended earlier in this batch move up with it
+                    for entry in appended:
+                        if entry[3 + pos] > row:
+                            entry[3 + pos] -= 1
+                appended = [entry for entry in appended if entry[0] != number]
+                removed.append(number)
+                written.discard(number)
+                continue
+            if record["no"] in written:
+                continue
+            data = record["data"]
+            for key in data:
+                if key not in headers:
+                    headers.append(key)
+                    cell = ws_detail.cell(row=1, column=len(headers), value=key)
+                    cell.style = DataService._named_style(wb, HEADER_STYLE)
+            ws_calc.append([record["no"], data.get("Total Amount", 0)])
+            ws_detail.append(
+                [record["no"]] + [data.get(h) for h in headers[1:]]
+            )
+            written.add(record["no"])
+            appended.append(
+                [
+                    record["no"],
+                    data.get("PDF Name"),
+                    data.get("Page Number"),
+                    ws_detail.max_row,
+                    ws_calc.max_row,
+                ]
+            )
 
-            # Get the No. value(s) to delete from Calculo
-            entry_numbers = matches["No."].tolist()
+        # Only the rows just appended; older rows keep their formatting
+        for entry in appended:
+            DataService._style_rows(ws_detail, entry[3], entry[3], CELL_STYLE)
+            DataService._style_rows(ws_calc, entry[4], entry[4], CELL_STYLE)
 
-            # Remove from Detalle
-            df_detail = df_detail[~mask]
+        # Written to a copy, so a crash never leaves a torn workbook
+        wb.save(out_path)
+        return [tuple(entry) for entry in appended], removed, index_off
 
-            # Read and filter Calculo
-            df_calculo = pd.read_excel(file_path, sheet_name="Calculo", skiprows=1)
-            calculo_mask = df_calculo["Numero de Peajes"].isin(entry_numbers)
-            df_calculo = df_calculo[~calculo_mask]
+    @staticmethod
+    def _named_style(wb, name):
+        """Registers the named style in wb on first use and returns its name."""
+        if name not in wb.style_names:
+            from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+
+            thin = Side(style="thin")
+            style = NamedStyle(name=name)
+            style.alignment = Alignment(horizontal="center")
+            style.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+            if name == HEADER_STYLE:
+                style.font = Font(bold=True)
+            wb.add_named_style(style)
+        return name
 
-            # Rewrite the Excel file
-            current_year = datetime.now().year
+    @staticmethod
+    def _style_rows(ws, min_row, max_row, style_name):
+        if max_row < min_row:
+            return
+        style_name = DataService._named_style(ws.parent, style_name)
+        for row in ws.iter_rows(min_row=min_row, max_row=max_row):
+            for cell in row:
+                cell.style = style_name
 
-            with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
-                # Write Calculo sheet
-                title_df = pd.DataFrame([[f"Calculo peajes {current_year}"]])
-                title_df.to_excel(
-                    writer, sheet_name="Calculo", index=False, header=False
-                )
-                if not df_calculo.empty:
-                    df_calculo.to_excel(
-                        writer, sheet_name="Calculo", index=False, header=True, startrow=1
-                    )
-                else:
-                    # Write just headers if empty
-                    pd.DataFrame(columns=["Numero de Peajes", "Total en BS"]).to_excel(
-                        writer, sheet_name="Calculo", index=False, header=True, startrow=1
-                    )
-
-                # Write Detalle sheet
-                df_detail.to_excel(
-                    writer, sheet_name="Detalle", index=False, header=True
-                )
+    @staticmethod
+    def _style_workbook(wb):
+        """Applies the header and cell styles to every row of both sheets."""
+        if "Calculo" in wb.sheetnames:
+            ws_calc = wb["Calculo"]
+            DataService._style_rows(ws_calc, 2, 2, HEADER_STYLE)
+            DataService._style_rows(ws_calc, 3, ws_calc.max_row, CELL_STYLE)
+        if "Detalle" in wb.sheetnames:
+            ws_detail = wb["Detalle"]
+            DataService._style_rows(ws_detail, 1, 1, HEADER_STYLE)
+            DataService._style_rows(ws_detail, 2, ws_detail.max_row, CELL_STYLE)
 
-                # Apply styling
-                thin_border = Border(
-                    left=Side(style="thin"),
-                    right=Side(style="thin"),
-                    top=Side(style="thin"),
-                    bottom=Side(style="thin"),
-                )
+    @staticmethod
+    def restyle_workbook(folder_path=None):
+        """
+        Maintenance: re-applies the shared styles to every row, e.g. to
+        repair workbooks written by older versions or edited by hand.
 
-                ws_calc = writer.book["Calculo"]
-                for row in ws_calc.iter_rows(min_row=2):
-                    for cell in row:
-                        cell.alignment = Alignment(horizontal="center")
-                        cell.border = thin_border
+        Returns:
+            (bool, str): Success flag and message.
+        """
+        from openpyxl import load_workbook
 
-                ws_detail = writer.book["Detalle"]
-                for row in ws_detail.iter_rows(min_row=1):
-                    for cell in row:
-                        cell.alignment = Alignment(horizontal="center")
-                        cell.border = thin_border
+        file_path, filename = DataService.get_excel_path(folder_path)
+        with _materialize_lock:
+            if not os.path.exists(file_path):
+                return False, "Excel file not found."
+            index = DataService._index(file_path)
+            try:
+                wb = load_workbook(file_path)
+                DataService._style_workbook(wb)
+                tmp_path = file_path + ".tmp"
+                wb.save(tmp_path)
+                # Rows did not move
+                index.apply_write(lambda: os.replace(tmp_path, file_path))
+            except Exception as e:
+                return False, str(e)
+        return True, f"Restyled {filename}"
+
+    @staticmethod
+    def has_toll_entry(pdf_name, page_number, folder_path=None):
+        """
+        Returns True if an entry exists in the Detalle sheet for the given PDF + page.
+        """
+        file_path, _ = DataService.get_excel_path(folder_path)
+        for record in DataService._pending_saves(file_path):
+            data = record["data"]
+            if str(data.get("PDF Name")) == str(pdf_name) and int(
+                data.get("Page Number", 0)
+            ) == int(page_number):
+                return True
+        # Served from the in-memory index; only a stat() touches the file
+        return bool(DataService._index(file_path).find(pdf_name, page_number))
 
-            return True, f"Removed toll #{entry_numbers[0]} from {filename}"
+    @staticmethod
+    def delete_toll_entry(pdf_name, page_number, folder_path=None, materialize=True):
+        """
+        Deletes a toll entry from the Excel file by matching PDF Name and Page Number.
+        Removes the corresponding row from both 'Detalle' and 'Calculo' sheets
+        in place, located through the workbook index.
+        Does NOT renumber remaining entries (toll numbers map to physical paper).
 
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return False, str(e)
+        Like a save, the delete is journaled and hidden from lookups right
+        away; with materialize=False the rows are only removed by a later
+        materialize() call.
+
+        Returns:
+            (bool, str): Success flag and message.
+        """
+        file_path, filename = DataService.get_excel_path(folder_path)
+        journal = DataService.get_journal()
+
+        with _state_lock:
+            index = DataService._index(file_path)
+            entry_numbers = index.find(pdf_name, page_number)
+            for record in DataService._pending_saves(file_path):
+                data = record["data"]
+                if str(data.get("PDF Name")) == str(pdf_name) and int(
+                    data.get("Page Number", 0)
+                ) == int(page_number):
+                    entry_numbers.append(record["no"])
+            # The same number twice would delete the row after it as well
+            entry_numbers = list(dict.fromkeys(entry_numbers))
+            if not entry_numbers:
+                return False, f"No entry found for '{pdf_name}' page {page_number}."
+
+            # Indexed rows, to check before scanning the sheets for them
+            records = [
+                {
+                    "op": "delete",
+                    "excel": file_path,
+                    "no": number,
+                    "rows": [
+                        index.detail_rows.get(number),
+                        index.calc_rows.get(number),
+                    ],
+                }
+                for number in entry_numbers
+            ]
+            index.mark_deleted(entry_numbers)
+            try:
+                for record in records:
+                    journal.append(record)
+            except Exception as e:
+                import traceback
+
+                traceback.print_exc()
+                index.unmark_deleted(entry_numbers)
+                return False, str(e)
+
+        if materialize:
+            success, msg = DataService._materialize_file(file_path)
+            if not success:
+                # The delete is safe in the journal and is retried later
+                return True, (
+                    f"Removed toll #{entry_numbers[0]} (Excel update pending: {msg})"
+                )
+        return True, f"Removed toll #{entry_numbers[0]} from {filename}"
+
+    @staticmethod
+    def _find_row(ws, number, expected_row, first_row):
+        """
+        Row holding toll `number` in column A. The indexed row is checked
+        first; the column is only scanned if the index was off.
+        """
+        if expected_row and ws.cell(row=expected_row, column=1).value == number:
+            return expected_row
+        for (row_idx, (value,)) in enumerate(
+            ws.iter_rows(min_row=first_row, max_col=1, values_only=True),
+            start=first_row,
+        ):
+            if value == number:
+                return row_idx
+        return None
 
     @staticmethod
     def get_processed_tolls(folder_path=None):
         """
         Returns a set of PDF filenames that have already been processed
-        (appear in the 'PDF Name' column of the 'Detalle' sheet).
+        (appear in the 'PDF Name' column of the 'Detalle' sheet, or are
+        still waiting in the journal).
         """
         try:
             file_path, _ = DataService.get_excel_path(folder_path)
-            if not os.path.exists(file_path):
-                return set()
-
-            # Read only the 'PDF Name' column from 'Detalle' sheet if it exists
-            # We don't know the exact column index, but we know the header "PDF Name"
-            # It's safer to read the whole sheet or specific columns by name if possible.
-            # However, pd.read_excel might fail if sheet doesn't exist.
-            try:
-                df = pd.read_excel(file_path, sheet_name="Detalle")
-                if "PDF Name" in df.columns:
-                    # Return set of non-null values
-                    return set(df["PDF Name"].dropna().astype(str).unique())
-            except ValueError:
-                # Sheet 'Detalle' usually raises ValueError if not found in some pandas versions/engines
-                pass
-            except Exception as e:
-                print(f"Error reading processed tolls: {e}")
-
-            return set()
-        except Exception as e:
-            print(f"Error in get_processed_tolls: {e}")
-            return set()
-            return set()
+            pending = {
+                str(r["data"].get("PDF Name"))
+                for r in DataService._pending_saves(file_path)
+            }
+            # Maintained by the workbook index; re-read only after outside edits
+            return pending | DataService._index(file_path).processed_pdfs()
         except Exception as e:
             print(f"Error in get_processed_tolls: {e}")
             return set()
@@ -0,0 +1,84 @@
+import time
+from collections import OrderedDict
+
+import fitz  # PyMuPDF
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_IDLE_TIMEOUT = 600  # seconds
+
+
+class DocumentPool:
+    """
+    Small LRU pool of open fitz documents.
+
+    Switching back to a recently used file returns the already parsed
+    document instead of re-reading its xref and page tree. Evicted
+    documents are closed so their file handles are released.
+    A pool is not thread-safe; each thread that renders owns its own.
+    """
+
+    def __init__(self, max_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.max_size = max(1, int(max_size))
+        self.idle_timeout = idle_timeout
+        self.opens = 0
+        self.reuses = 0
+        self.evictions = 0
+        # path -> [doc, last_used]
+        self._docs = OrderedDict()
+
+    def acquire(self, path):
+        """Returns an open document for path, opening it if needed."""
+        now = time.monotonic()
+        entry = self._docs.get(path)
+        if entry is not None and not entry[0].is_closed:
+            entry[1] = now
+            self._docs.move_to_end(path)
+            self.reuses += 1
+            self._evict_idle(now, keep=path)
+            return entry[0]
+
+        doc = fitz.open(path)
+        self.opens += 1
+        self._docs[path] = [doc, now]
+        self._docs.move_to_end(path)
+        self._evict_idle(now, keep=path)
+        while len(self._docs) > self.max_size:
+            self._evict(next(iter(self._docs)))
+        return doc
+
+    def _evict_idle(self, now, keep=None):
+        if not self.idle_timeout:
+            return
+        for path, (_, last_used) in list(self._docs.items()):
+            if path != keep and now - last_used > self.idle_timeout:
+                self._evict(path)
+
+    def _evict(self, path):
+        doc, _ = self._docs.pop(path)
+        doc.close()
+        self.evictions += 1
+
+    def release(self, path):
+        """Closes one document if it is pooled."""
+        if path in self._docs:
+            self._evict(path)
+
+    def close_all(self):
+        for doc, _ in self._docs.values():
+            doc.close()
+        self._docs.clear()
+
+    def __contains__(self, path):
+        return path in self._docs
+
+    def __len__(self):
+        return len(self._docs)
+
+    def stats(self):
+        return {
+            "open": len(self._docs),
+            "max_size": self.max_size,
+            "opens": self.opens,
+            "reuses": self.reuses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,229 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import deque
+
+# Standard toll rates the fake picks from
+FAKE_RATES = (1.50, 2.75, 3.00, 4.25, 5.50, 7.00, 12.40)
+
+
+class FakeAPIError(Exception):
+    """Mimics the SDK's API errors, which carry an HTTP status code."""
+
+    def __init__(self, code, message):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    def __init__(self, name):
+        self.name = f"models/{name}"
+
+
+def fake_tolls_for(data):
+    """Deterministic toll entries for one page image's bytes."""
+    digest = hashlib.sha256(data).digest()
+    count = 1 + digest[0] % 4
+    tolls = []
+    for i in range(count):
+        amount = FAKE_RATES[(digest[1 + i] + i) % len(FAKE_RATES)]
+        if any(t["amount"] == amount for t in tolls):
+            continue
+        tolls.append({"amount": amount, "quantity": 1 + digest[8 + i] % 5})
+    return tolls
+
+
+def images_in(contents):
+    """Bytes of the inline images in a request's contents."""
+    return [
+        part.inline_data.data
+        for part in contents
+        if getattr(part, "inline_data", None) is not None
+    ]
+
+
+class FakeModels:
+    """Implements the slice of genai.Client.models used by TollAnalyzer."""
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def generate_content(self, model, contents, config=None):
+        return FakeResponse(self.backend.respond(model, contents, config))
+
+    def generate_content_stream(self, model, contents, config=None):
+        text = self.backend.respond(model, contents, config)
+        step = self.backend.stream_chunk_chars
+        for i in range(0, len(text), step):
+            yield FakeResponse(text[i : i + step])
+
+    def list(self):
+        return [FakeModel(name) for name in self.backend.model_names]
+
+
+class FakeBackend:
+    """
+    Offline stand-in for the Gemini client, for tests and benchmarks.
+
+    Plug it in with TollAnalyzer(backend=FakeBackend(...)). Answers are
+    derived from a hash of each page image, so the same page always yields
+    the same tolls. Latency is log-normal around latency_s (plus
+    per_page_latency_s per image). 429s, timeouts and malformed JSON are
+    injected at the given rates, and requests beyond max_concurrent or
+    requests_per_minute are rejected with 429 like a real quota.
+    """
+
+    def __init__(
+        self,
+        latency_s=0.5,
+        latency_sigma=0.3,
+        per_page_latency_s=0.1,
+        error_429_rate=0.0,
+        timeout_rate=0.0,
+        timeout_s=5.0,
+        malformed_rate=0.0,
+        max_concurrent=None,
+        requests_per_minute=None,
+        seed=0,
+        model_names=("gemini-flash-lite-latest", "gemini-flash-latest"),
+    ):
+        self.latency_s = latency_s
+        self.latency_sigma = latency_sigma
+        self.per_page_latency_s = per_page_latency_s
+        self.error_429_rate = error_429_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_s = timeout_s
+        self.malformed_rate = malformed_rate
+        self.max_concurrent = max_concurrent
+        self.requests_per_minute = requests_per_minute
+        self.model_names = list(model_names)
+        self.stream_chunk_chars = 24
+        self.models = FakeModels(self)
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent = deque()  # Start times inside the last minute
+        self._active = 0
+        self.stats = {
+            "requests": 0,
+            "pages": 0,
+            "rejected_429": 0,
+            "timeouts": 0,
+            "malformed": 0,
+            "peak_concurrency": 0,
+        }
+
+    def respond(self, model, contents, config=None):
+        images = images_in(contents)
+        with self._lock:
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 60:
+                self._recent.popleft()
+            self.stats["requests"] += 1
+            over_rate = (
+                self.requests_per_minute is not None
+                and len(self._recent) >= self.requests_per_minute
+            )
+            over_concurrency = (
+                self.max_concurrent is not None and self._active >= self.max_concurrent
+            )
+            roll = self._random.random()
+            malformed = self._random.random() < self.malformed_rate
+            latency = self.latency_s * self._random.lognormvariate(0, self.latency_sigma)
+            if over_rate or over_concurrency or roll < self.error_429_rate:
+                self.stats["rejected_429"] += 1
+                raise FakeAPIError(429, "RESOURCE_EXHAUSTED")
+            self._recent.append(now)
+            self._active += 1
+            self.stats["peak_concurrency"] = max(
+                self.stats["peak_concurrency"], self._active
+            )
+            self.stats["pages"] += len(images)
+
+        try:
+            if roll < self.error_429_rate + self.timeout_rate:
+                with self._lock:
+                    self.stats["timeouts"] += 1
+                time.sleep(self.timeout_s)
+                raise TimeoutError("Request timed out")
+            time.sleep(latency + self.per_page_latency_s * len(images))
+        finally:
+            with self._lock:
+                self._active -= 1
+
+        text = self._answer(images, config)
+        if malformed:
+            with self._lock:
+                self.stats["malformed"] += 1
+            return text[: len(text) // 2]
+        return text
+
+    @staticmethod
+    def _answer(images, config):
+        schema = getattr(config, "response_schema", None) or {}
+        if isinstance(schema, dict):
+            properties = schema.get("properties", {})
+        else:
+            properties = getattr(schema, "properties", None) or {}
+        if "pages" in properties:
+            pages = [
+                {"page_index": idx, "tolls": fake_tolls_for(data)}
+                for idx, data in enumerate(images)
+            ]
+            return json.dumps({"pages": pages})
+        tolls = fake_tolls_for(images[0]) if images else []
+        return json.dumps({"tolls": tolls})
+
+
+class ScriptedModels(FakeModels):
+    def generate_content(self, model, contents, config=None):
+        reply = self.backend.respond(model, contents, config)
+        if isinstance(reply, Exception):
+            raise reply
+        return FakeResponse(reply)
+
+    def generate_content_stream(self, model, contents, config=None):
+        for chunk in self.backend.respond(model, contents, config):
+            if isinstance(chunk, Exception):
+                raise chunk  # Error in the middle of the stream
+            yield FakeResponse(chunk)
+
+
+class ScriptedBackend:
+    """
+    Backend with exact, scripted answers for tests that check parsing,
+    retries or escalation rather than load.
+
+    `replies` is a response text used for every request, a list answered
+    in order, a {model: text} dict, or a callable(model, images) -> text.
+    A streamed request's reply is a list of chunks. An Exception in place
+    of a reply (or chunk) is raised. Each request is recorded in `calls`
+    as (model, number of images, config).
+    """
+
+    def __init__(self, replies, model_names=("scripted",)):
+        self.replies = replies
+        self.model_names = list(model_names)
+        self.calls = []
+        self.models = ScriptedModels(self)
+        self._queue = list(replies) if isinstance(replies, list) else None
+        self._lock = threading.Lock()
+
+    def respond(self, model, contents, config=None):
+        images = images_in(contents)
+        with self._lock:
+            self.calls.append((model, len(images), config))
+            if self._queue is not None:
+                return self._queue.pop(0)
+        if callable(self.replies):
+            return self.replies(model, images)
+        if isinstance(self.replies, dict):
+            return self.replies[model]
+        return self.replies
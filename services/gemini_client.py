@@ -0,0 +1,196 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from dotenv import load_dotenv
+from google import genai
+
+from services.rate_limit import TokenBucket
+
+load_dotenv()
+
+DEFAULT_MAX_CONCURRENT = 4
+# 0 disables the token bucket; quota errors still trigger backoff
+DEFAULT_REQUESTS_PER_MINUTE = 0
+DEFAULT_QUOTA_RETRIES = 3
+
+# Error markers meaning "slow down" rather than "this request is bad"
+QUOTA_ERRORS = ("429", "503", "RESOURCE_EXHAUSTED", "UNAVAILABLE")
+QUOTA_STATUS_CODES = (429, 503)
+
+BACKOFF_BASE_S = 1.0
+BACKOFF_MAX_S = 60.0
+# Rate floor when shrinking the bucket after quota errors
+MIN_REQUESTS_PER_MINUTE = 5
+
+_client = None
+_client_lock = threading.Lock()
+_gate = None
+_gate_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Returns the process-wide genai.Client, creating it on first use, or
+    None if GEMINI_API_KEY is not set or the client cannot be created.
+    The client is safe to share between threads.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                return None
+            try:
+                _client = genai.Client(api_key=api_key)
+            except Exception as e:
+                print(f"Failed to initialize GenAI Client: {e}")
+                return None
+        return _client
+
+
+def get_gate():
+    """Returns the RequestGate shared by every Gemini caller in the process."""
+    global _gate
+    with _gate_lock:
+        if _gate is None:
+            _gate = RequestGate()
+        return _gate
+
+
+def is_quota_error(error):
+    if getattr(error, "code", None) in QUOTA_STATUS_CODES:
+        return True
+    message = str(error)
+    return any(marker in message for marker in QUOTA_ERRORS)
+
+
+class RequestGate:
+    """
+    Admission control for Gemini requests: at most max_concurrent in flight,
+    an optional requests-per-minute token bucket, and adaptive backoff.
+
+    A quota error (429/503) pauses every caller for an exponentially growing
+    cool-down, halves the bucket rate and retries the request. Successful
+    requests shrink the cool-down and restore the rate step by step.
+    """
+
+    def __init__(
+        self,
+        max_concurrent=DEFAULT_MAX_CONCURRENT,
+        requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+        max_retries=DEFAULT_QUOTA_RETRIES,
+    ):
+        self._lock = threading.Lock()
+        self.max_retries = max_retries
+        self._backoff = 0.0
+        self._paused_until = 0.0
+        self._latencies = deque(maxlen=500)
+        self.stats = {
+            "requests": 0,
+            "in_flight": 0,
+            "queued": 0,
+            "throttled": 0,
+            "errors": 0,
+        }
+        self.configure(max_concurrent, requests_per_minute)
+
+    def configure(self, max_concurrent=None, requests_per_minute=None):
+        """Changes limits; requests already admitted are not affected."""
+        with self._lock:
+            if max_concurrent is not None:
+                self.max_concurrent = max(1, int(max_concurrent))
+                self._slots = threading.BoundedSemaphore(self.max_concurrent)
+            if requests_per_minute is not None:
+                self.requests_per_minute = float(requests_per_minute)
+                self._current_rpm = self.requests_per_minute
+                self._bucket = (
+                    TokenBucket(self.requests_per_minute)
+                    if self.requests_per_minute > 0
+                    else None
+                )
+
+    def call(self, fn, *args, **kwargs):
+        """Runs fn(*args, **kwargs) under the limits, retrying quota errors."""
+        attempt = 0
+        while True:
+            self._wait_pause()
+            with self._lock:
+                self.stats["queued"] += 1
+                slots, bucket = self._slots, self._bucket
+            slots.acquire()
+            try:
+                if bucket is not None:
+                    bucket.acquire()
+                with self._lock:
+                    self.stats["queued"] -= 1
+                    self.stats["in_flight"] += 1
+                    self.stats["requests"] += 1
+                start = time.monotonic()
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    error = e
+                else:
+                    error = None
+                    self._on_success(time.monotonic() - start)
+                finally:
+                    with self._lock:
+                        self.stats["in_flight"] -= 1
+            finally:
+                slots.release()
+
+            if error is None:
+                return result
+            if not is_quota_error(error) or attempt >= self.max_retries:
+                with self._lock:
+                    self.stats["errors"] += 1
+                raise error
+            attempt += 1
+            self._on_throttled()
+
+    def _wait_pause(self):
+        while True:
+            with self._lock:
+                delay = self._paused_until - time.monotonic()
+            if delay <= 0:
+                return
+            time.sleep(delay)
+
+    def _on_success(self, latency):
+        with self._lock:
+            self._latencies.append(latency)
+            self._backoff /= 2
+            if self._backoff < BACKOFF_BASE_S:
+                self._backoff = 0.0
+            # Additive recovery towards the configured rate
+            if self._bucket is not None and self._current_rpm < self.requests_per_minute:
+                self._current_rpm = min(self.requests_per_minute, self._current_rpm + 1)
+                self._bucket.set_rate(self._current_rpm)
+
+    def _on_throttled(self):
+        with self._lock:
+            self.stats["throttled"] += 1
+            self._backoff = min(BACKOFF_MAX_S, max(BACKOFF_BASE_S, self._backoff * 2))
+            # Jitter so paused callers do not all resume at the same instant
+            pause = self._backoff * (0.5 + random.random() / 2)
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+            if self._bucket is not None:
+                self._current_rpm = max(MIN_REQUESTS_PER_MINUTE, self._current_rpm / 2)
+                self._bucket.set_rate(self._current_rpm)
+
+    def metrics(self):
+        """Counters plus p50/p95 latency (seconds) of recent successful calls."""
+        with self._lock:
+            metrics = dict(self.stats)
+            latencies = sorted(self._latencies)
+            metrics["requests_per_minute"] = self._current_rpm
+            metrics["backoff_s"] = self._backoff
+        if latencies:
+            metrics["p50_s"] = latencies[len(latencies) // 2]
+            metrics["p95_s"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        else:
+            metrics["p50_s"] = metrics["p95_s"] = None
+        return metrics
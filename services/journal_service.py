@@ -0,0 +1,72 @@
+import json
+import os
+import threading
+
+JOURNAL_FILE = "toll_journal.jsonl"
+
+
+class TollJournal:
+    """
+    Append-only JSONL log of saved toll entries that have not been written
+    to the Excel workbook yet. Appending is O(1) and fsynced, so a save is
+    durable as soon as append() returns; DataService.materialize() later
+    writes the pending records to the workbook and removes them here.
+    """
+
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.records = []
+        self._seq = 0
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line from a crash
+                    self.records.append(record)
+                    self._seq = max(self._seq, record.get("seq", 0))
+
+    def append(self, record):
+        """Stores record durably and returns it with its sequence number."""
+        with self._lock:
+            self._seq += 1
+            record = dict(record, seq=self._seq)
+            line = json.dumps(record, ensure_ascii=False)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.records.append(record)
+            return record
+
+    def pending(self, excel_path=None):
+        """Records not yet materialized, optionally only for one workbook."""
+        with self._lock:
+            return [
+                r
+                for r in self.records
+                if excel_path is None or r.get("excel") == excel_path
+            ]
+
+    def discard(self, seqs):
+        """Drops materialized records, rewriting the (short) journal file."""
+        seqs = set(seqs)
+        with self._lock:
+            self.records = [r for r in self.records if r.get("seq") not in seqs]
+            if not self.records:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                return
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in self.records:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def __len__(self):
+        with self._lock:
+            return len(self.records)
@@ -0,0 +1,82 @@
+import io
+
+from PIL import Image, ImageOps
+
+# Settings for the page image sent to Gemini. Overridable through
+# "ai_payload" in config.json.
+DEFAULT_PAYLOAD_OPTIONS = {
+    "grayscale": True,
+    "trim_margins": True,
+    "max_dimension": 2000,
+    "format": "PNG",  # PNG, JPEG or WEBP
+    "quality": 85,  # JPEG/WEBP only
+}
+
+MIME_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+# Pixels darker than this (0-255) count as content when trimming margins
+TRIM_THRESHOLD = 235
+TRIM_PADDING = 8
+
+
+def payload_options(overrides=None):
+    options = dict(DEFAULT_PAYLOAD_OPTIONS)
+    if overrides:
+        options.update(overrides)
+    options["format"] = str(options["format"]).upper().replace("JPG", "JPEG")
+    return options
+
+
+def options_signature(options):
+    """Short string identifying the encoding, used in AI cache keys."""
+    return "{format}:{quality}:{max_dimension}:{grayscale:d}:{trim_margins:d}".format(
+        **options
+    )
+
+
+def trim_white_margins(img):
+    gray = img.convert("L") if img.mode != "L" else img
+    mask = gray.point(lambda p: 255 if p < TRIM_THRESHOLD else 0)
+    bbox = mask.getbbox()
+    if not bbox:
+        return img  # Blank page, nothing to trim
+    left, top, right, bottom = bbox
+    return img.crop(
+        (
+            max(0, left - TRIM_PADDING),
+            max(0, top - TRIM_PADDING),
+            min(img.width, right + TRIM_PADDING),
+            min(img.height, bottom + TRIM_PADDING),
+        )
+    )
+
+
+def encode_page_image(img, options=None):
+    """
+    Prepares a PIL page image for upload.
+
+    Returns:
+        (bytes, str): Encoded image and its MIME type.
+    """
+    options = options or payload_options()
+
+    if options["grayscale"]:
+        img = ImageOps.grayscale(img)
+    elif img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    if options["trim_margins"]:
+        img = trim_white_margins(img)
+
+    max_dim = options.get("max_dimension")
+    if max_dim and max(img.size) > max_dim:
+        img = img.copy()
+        img.thumbnail((max_dim, max_dim), Image.LANCZOS)
+
+    fmt = options["format"]
+    buf = io.BytesIO()
+    if fmt == "PNG":
+        img.save(buf, format="PNG", optimize=False)
+    else:
+        img.save(buf, format=fmt, quality=int(options["quality"]))
+    return buf.getvalue(), MIME_TYPES[fmt]
@@ -1,17 +1,29 @@
+import io
+
 import fitz  # PyMuPDF
 from PIL import Image
 
+from services.document_pool import DocumentPool
+from services.render_cache import RenderCache
+from services.text_service import DEFAULT_MIN_CONFIDENCE, extract_tolls_from_page
+
+# Edge length in pixels of the squares used for tiled (high zoom) rendering
+TILE_SIZE = 512
+
 class PDFHandler:
-    def __init__(self):
+    def __init__(self, render_cache=None, document_pool=None):
         self.doc = None
         self.current_page_idx = 0
         self.path = None
+        self.render_cache = render_cache if render_cache is not None else RenderCache()
+        self.document_pool = (
+            document_pool if document_pool is not None else DocumentPool()
+        )
 
     def open_pdf(self, path):
         try:
-            if self.doc:
-                self.doc.close()
-            self.doc = fitz.open(path)
+            # Previous document stays open in the pool for quick switching back
+            self.doc = self.document_pool.acquire(path)
             self.path = path
             self.current_page_idx = 0
             return True
@@ -24,19 +36,130 @@ class PDFHandler:
             return self.doc.page_count
         return 0
 
-    def get_page_image(self, page_num, zoom=1.0):
+    def get_page_pnm(self, page_num, zoom=1.0, colorspace="rgb"):
+        """
+        Returns the page as a RenderedPage (PPM/PGM bytes), which the viewer
+        can hand straight to Tk without going through PIL.
+        """
         if not self.doc or page_num < 0 or page_num >= self.doc.page_count:
             return None
-        
-        page = self.doc.load_page(page_num)
-        mat = fitz.Matrix(zoom, zoom)
-        pix = page.get_pixmap(matrix=mat)
-        
-        # Convert to PIL Image
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        return img
-    
+
+        key = RenderCache.make_key(self.path, page_num, zoom, colorspace)
+        rendered = self.render_cache.get(key)
+        if rendered is not None:
+            return rendered
+
+        rendered = render_page_pnm(self.doc, page_num, zoom, colorspace)
+        self.render_cache.put(key, rendered)
+        return rendered
+
+    def has_cached_page(self, page_num, zoom=1.0, colorspace="rgb"):
+        key = RenderCache.make_key(self.path, page_num, zoom, colorspace)
+        return key in self.render_cache
+
+    def get_page_size(self, page_num):
+        """Returns the (width, height) of a page in PDF points at zoom 1.0."""
+        if not self.doc or page_num < 0 or page_num >= self.doc.page_count:
+            return None
+        rect = self.doc.load_page(page_num).rect
+        return rect.width, rect.height
+
+    def get_page_tile(self, page_num, zoom, col, row, tile_size=TILE_SIZE):
+        """
+        Returns one tile_size x tile_size square of the page at the given zoom
+        (smaller at the right and bottom edges), rendered with a clip rect.
+        """
+        if not self.doc or page_num < 0 or page_num >= self.doc.page_count:
+            return None
+
+        tile = (col, row, tile_size)
+        key = RenderCache.make_key(self.path, page_num, zoom, "rgb", tile=tile)
+        rendered = self.render_cache.get(key)
+        if rendered is not None:
+            return rendered
+
+        rendered = render_page_tile(self.doc, page_num, zoom, col, row, tile_size)
+        if rendered is not None:
+            self.render_cache.put(key, rendered)
+        return rendered
+
+    def extract_text_tolls(self, page_num, min_confidence=DEFAULT_MIN_CONFIDENCE):
+        """
+        Returns tolls read from the page's text layer, or None if the page
+        has no usable text (scans) and needs the AI.
+        """
+        if not self.doc or page_num < 0 or page_num >= self.doc.page_count:
+            return None
+        try:
+            return extract_tolls_from_page(self.doc.load_page(page_num), min_confidence)
+        except Exception as e:
+            print(f"Text extraction failed: {e}")
+            return None
+
+    def get_page_image(self, page_num, zoom=1.0, colorspace="rgb"):
+        """Returns the page as a PIL Image (used by the AI analysis)."""
+        rendered = self.get_page_pnm(page_num, zoom, colorspace)
+        if rendered is None:
+            return None
+        return rendered.to_image()
+
     def close(self):
-        if self.doc:
-            self.doc.close()
-            self.doc = None
+        self.document_pool.close_all()
+        self.doc = None
+
+
+class RenderedPage:
+    """
+    A rasterized page kept as binary PPM (RGB) or PGM (gray) bytes.
+    Tk's photo image reads this format natively.
+    """
+
+    __slots__ = ("width", "height", "data")
+
+    def __init__(self, width, height, data):
+        self.width = width
+        self.height = height
+        self.data = data
+
+    @classmethod
+    def from_image(cls, img):
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        buf = io.BytesIO()
+        img.save(buf, format="PPM")
+        return cls(img.width, img.height, buf.getvalue())
+
+    def to_image(self):
+        img = Image.open(io.BytesIO(self.data))
+        img.load()
+        return img
+
+
+def render_page_pnm(doc, page_num, zoom=1.0, colorspace="rgb"):
+    """
+    Rasterizes one page of an open fitz document into a RenderedPage.
+    colorspace is "rgb" or "gray".
+    """
+    page = doc.load_page(page_num)
+    mat = fitz.Matrix(zoom, zoom)
+    if colorspace == "gray":
+        pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY)
+    else:
+        pix = page.get_pixmap(matrix=mat)
+    return RenderedPage(pix.width, pix.height, pix.tobytes("pnm"))
+
+
+def render_page_tile(doc, page_num, zoom, col, row, tile_size=TILE_SIZE):
+    """
+    Rasterizes only the part of a page covered by one tile, using a fitz
+    clip rectangle so the cost does not depend on the full page size.
+    Returns None if the tile lies outside the page.
+    """
+    page = doc.load_page(page_num)
+    step = tile_size / zoom
+    clip = fitz.Rect(col * step, row * step, (col + 1) * step, (row + 1) * step)
+    clip = clip & page.rect
+    if clip.is_empty:
+        return None
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip)
+    return RenderedPage(pix.width, pix.height, pix.tobytes("pnm"))
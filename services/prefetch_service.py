@@ -0,0 +1,159 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from services.document_pool import DocumentPool
+from services.pdf_service import TILE_SIZE, render_page_pnm, render_page_tile
+from services.render_cache import RenderCache
+from services.text_service import DEFAULT_MIN_CONFIDENCE, extract_tolls_from_page
+
+
+class PagePrefetcher:
+    """
+    Renders pages on a single background thread into a shared RenderCache.
+
+    fitz documents are not thread-safe, so the worker opens its own
+    documents instead of touching the one owned by PDFHandler.
+    Each call to prefetch() supersedes the previous batch.
+    """
+
+    def __init__(self, render_cache, document_pool=None):
+        self.render_cache = render_cache
+        self.executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="page-prefetch"
+        )
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._futures = []
+        # Only ever touched from the worker thread
+        self.document_pool = (
+            document_pool if document_pool is not None else DocumentPool(max_size=4)
+        )
+        # path -> number of pages, for every document the worker has opened
+        self.page_counts = {}
+
+    def prefetch(self, jobs):
+        """
+        Queues (path, page_num, zoom) jobs, cancelling whatever was pending.
+        """
+        with self._lock:
+            self._cancel_pending()
+            generation = self._generation
+            for path, page_num, zoom in jobs:
+                key = RenderCache.make_key(path, page_num, zoom)
+                if key in self.render_cache:
+                    continue
+                self._futures.append(
+                    self.executor.submit(self._render, generation, key)
+                )
+
+    def render(self, path, page_num, zoom, colorspace="rgb"):
+        """
+        Renders one page on the worker thread ahead of any prefetch that is
+        queued later. Returns a Future resolving to a RenderedPage (or None).
+        Not affected by cancel(); callers cancel the returned Future instead.
+        """
+        key = RenderCache.make_key(path, page_num, zoom, colorspace)
+        return self.executor.submit(self._render_now, key)
+
+    def render_tile(self, path, page_num, zoom, col, row, tile_size=TILE_SIZE):
+        """
+        Renders one tile of a page on the worker thread, like render().
+        Returns a Future resolving to a RenderedPage (or None outside the page).
+        """
+        key = RenderCache.make_key(
+            path, page_num, zoom, "rgb", tile=(col, row, tile_size)
+        )
+        return self.executor.submit(self._render_tile_now, key)
+
+    def read_text(self, path, page_num, min_confidence=DEFAULT_MIN_CONFIDENCE):
+        """
+        Reads tolls from the page's text layer on the worker thread.
+        Returns a Future resolving to extract_tolls_from_page's result.
+        """
+        return self.executor.submit(
+            self._read_text_now, path, page_num, min_confidence
+        )
+
+    def page_count(self, path):
+        """
+        Returns a Future resolving to the number of pages of path (0 if it
+        cannot be opened), read on the worker thread.
+        """
+        return self.executor.submit(self._page_count_now, path)
+
+    def cancel(self):
+        with self._lock:
+            self._cancel_pending()
+
+    def _cancel_pending(self):
+        self._generation += 1
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+
+    def _render(self, generation, key):
+        # Skip jobs that were superseded while waiting in the queue
+        if generation != self._generation or key in self.render_cache:
+            return
+        self._render_now(key)
+
+    def _render_now(self, key):
+        rendered = self.render_cache.get(key)
+        if rendered is not None:
+            return rendered
+        path, page_num, zoom, colorspace = key
+        try:
+            doc = self._acquire(path)
+            if page_num < 0 or page_num >= doc.page_count:
+                return None
+            rendered = render_page_pnm(doc, page_num, zoom, colorspace)
+            self.render_cache.put(key, rendered)
+            return rendered
+        except Exception as e:
+            print(f"Render failed for {path} page {page_num + 1}: {e}")
+            return None
+
+    def _render_tile_now(self, key):
+        rendered = self.render_cache.get(key)
+        if rendered is not None:
+            return rendered
+        path, page_num, zoom, _, (col, row, tile_size) = key
+        try:
+            doc = self._acquire(path)
+            if page_num < 0 or page_num >= doc.page_count:
+                return None
+            rendered = render_page_tile(doc, page_num, zoom, col, row, tile_size)
+            if rendered is not None:
+                self.render_cache.put(key, rendered)
+            return rendered
+        except Exception as e:
+            print(f"Tile render failed for {path} page {page_num + 1}: {e}")
+            return None
+
+    def _acquire(self, path):
+        doc = self.document_pool.acquire(path)
+        self.page_counts[path] = doc.page_count
+        return doc
+
+    def _page_count_now(self, path):
+        try:
+            return self._acquire(path).page_count
+        except Exception as e:
+            print(f"Could not open {path}: {e}")
+            self.page_counts[path] = 0
+            return 0
+
+    def _read_text_now(self, path, page_num, min_confidence):
+        try:
+            doc = self._acquire(path)
+            if page_num < 0 or page_num >= doc.page_count:
+                return None
+            return extract_tolls_from_page(doc.load_page(page_num), min_confidence)
+        except Exception as e:
+            print(f"Text extraction failed for {path} page {page_num + 1}: {e}")
+            return None
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.submit(self.document_pool.close_all)
+        self.executor.shutdown(wait=True)
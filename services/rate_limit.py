@@ -0,0 +1,45 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. acquire() blocks until a token is available,
+    so callers are held to rate_per_minute on average with bursts of up to
+    `burst` requests.
+    """
+
+    def __init__(self, rate_per_minute, burst=None):
+        self.rate = float(rate_per_minute) / 60.0
+        self.capacity = float(burst if burst is not None else max(1, rate_per_minute / 60))
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_rate(self, rate_per_minute):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = float(rate_per_minute) / 60.0
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def acquire(self, timeout=None):
+        """
+        Takes one token, waiting if needed. Returns the time spent waiting,
+        or None if timeout expired first.
+        """
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - start
+                wait = (1 - self.tokens) / self.rate if self.rate > 0 else 0.1
+            if timeout is not None and now - start + wait > timeout:
+                return None
+            time.sleep(wait)
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_BUDGET_MB = 256
+
+
+class RenderCache:
+    """
+    Byte-budgeted LRU cache of rendered pages.
+
+    Keys are (document path, page index, zoom, colorspace) tuples, with a
+    trailing (column, row, size) element for tiles. Values are
+    RenderedPage objects (sized by their PNM bytes) or PIL images (sized by
+    width * height * bands).
+    Thread-safe so background renderers can share one instance with the UI.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_BUDGET_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(path, page_num, zoom, colorspace="rgb", tile=None):
+        # Zoom is rounded so 1.2000000001 and 1.2 share an entry
+        key = (path, int(page_num), round(float(zoom), 3), colorspace)
+        if tile is not None:
+            # (column, row, tile size) of a clipped render
+            key += (tuple(tile),)
+        return key
+
+    @staticmethod
+    def _size_of(value):
+        data = getattr(value, "data", None)
+        if isinstance(data, (bytes, bytearray)):
+            return len(data)
+        return value.width * value.height * len(value.getbands())
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = self._size_of(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            # Never keep a single entry larger than the whole budget
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def invalidate(self, path=None):
+        """Drops every entry, or only those belonging to one document."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self.current_bytes = 0
+                return
+            for key in [k for k in self._entries if k[0] == path]:
+                self.current_bytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            }
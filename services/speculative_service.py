@@ -0,0 +1,94 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_LOOKAHEAD = 3
+DEFAULT_MAX_CONCURRENT = 2
+
+
+class SpeculativeAnalyzer:
+    """
+    Analyzes upcoming pages in the background while the operator verifies
+    the current one.
+
+    Jobs are keyed by (pdf path, page index). Calling update() with the new
+    list of upcoming pages cancels queued jobs for pages that are no longer
+    ahead; results of jobs that already ran for skipped pages are discarded.
+    Pages with a usable text layer are answered from it without the AI.
+    At most max_concurrent AI requests run at once.
+    """
+
+    def __init__(
+        self, analyzer, render, max_concurrent=DEFAULT_MAX_CONCURRENT, read_text=None
+    ):
+        # render(path, page_idx) -> Future of a RenderedPage
+        self.analyzer = analyzer
+        self.render = render
+        # read_text(path, page_idx) -> Future of a text-layer result or None
+        self.read_text = read_text
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, int(max_concurrent)),
+            thread_name_prefix="ai-speculative",
+        )
+        self.model = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def update(self, targets, model=None):
+        """
+        Makes targets (ordered (path, page_idx) keys) the set of pages being
+        pre-analyzed with model.
+        """
+        with self._lock:
+            if model != self.model:
+                self._cancel_jobs(list(self._jobs))
+                self.model = model
+            self._cancel_jobs([key for key in self._jobs if key not in targets])
+            for key in targets:
+                if key not in self._jobs:
+                    self._jobs[key] = self.executor.submit(self._analyze, key, model)
+
+    def take(self, key):
+        """
+        Removes and returns the Future for key (or None). The caller owns it
+        from then on.
+        """
+        with self._lock:
+            return self._jobs.pop(key, None)
+
+    def cancel_all(self):
+        with self._lock:
+            self._cancel_jobs(list(self._jobs))
+
+    def _cancel_jobs(self, keys):
+        for key in keys:
+            self._jobs.pop(key).cancel()
+
+    def _analyze(self, key, model):
+        path, page_idx = key
+        if self.read_text is not None:
+            # Digital PDFs need no AI request, as in the batch pipeline
+            try:
+                result = self.read_text(path, page_idx).result()
+            except Exception:
+                result = None
+            if result is not None:
+                return result
+        try:
+            rendered = self.render(path, page_idx).result()
+        except Exception as e:
+            return {"error": str(e), "tolls": []}
+        if rendered is None:
+            return {"error": "Page could not be rendered", "tolls": []}
+
+        img = rendered.to_image()
+        if model:
+            return self.analyzer.analyze_page(img, model=model)
+        return self.analyzer.analyze_page(img)
+
+    def pending(self):
+        with self._lock:
+            return [key for key, future in self._jobs.items() if not future.done()]
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+
+from utils.amount_utils import parse_amount
+
+# Below this many words the page is treated as a scan without a text layer
+MIN_WORDS = 3
+DEFAULT_MIN_CONFIDENCE = 0.75
+
+TOTAL_WORDS = ("total", "totales", "suma")
+TOLL_WORDS = ("peaje", "peajes", "toll", "tolls", "tarifa", "monto", "ticket")
+
+
+def extract_tolls_from_page(page, min_confidence=DEFAULT_MIN_CONFIDENCE):
+    """
+    Reads toll amounts from a page's text layer instead of asking the AI.
+
+    Amounts on lines containing a "total" word are taken as the stated page
+    total and used to check the others. Without one, only amounts on toll
+    keyword lines count, and other amounts on the page (subtotals, tax)
+    lower the confidence. Returns the same structure as
+    TollAnalyzer.analyze_page plus "source", "confidence" and "text_total",
+    or None when there is no usable text layer or confidence is too low.
+    """
+    words = page.get_text("words")
+    if len(words) < MIN_WORDS:
+        return None
+
+    # Group words into lines using PyMuPDF's (block, line) numbers
+    lines = OrderedDict()
+    for x0, y0, x1, y1, text, block_no, line_no, word_no in words:
+        lines.setdefault((block_no, line_no), []).append(text)
+
+    amounts = []
+    keyword_amounts = []
+    stated_total = None
+    for line_words in lines.values():
+        lowered = [w.lower().strip(":.") for w in line_words]
+        line_amounts = [a for a in (parse_amount(w) for w in line_words) if a]
+        if not line_amounts:
+            continue
+        if any(w in TOTAL_WORDS for w in lowered):
+            # Last amount on a total line is the stated total
+            stated_total = line_amounts[-1]
+            continue
+        if any(w in TOLL_WORDS for w in lowered):
+            keyword_amounts.extend(line_amounts)
+        amounts.extend(line_amounts)
+
+    if not amounts:
+        return None
+
+    stray_amounts = len(amounts) > len(keyword_amounts)
+    if keyword_amounts and stated_total is not None:
+        # A total matching the toll lines alone means the rest is breakdown
+        if abs(stated_total - sum(keyword_amounts)) < 0.01:
+            amounts = keyword_amounts
+    elif keyword_amounts:
+        amounts = keyword_amounts
+
+    # Group by amount, as the AI prompt asks for
+    grouped = OrderedDict()
+    for amount in amounts:
+        grouped[amount] = grouped.get(amount, 0) + 1
+    tolls = [{"amount": a, "quantity": q} for a, q in grouped.items()]
+    total = sum(a * q for a, q in grouped.items())
+
+    if stated_total is not None:
+        confidence = 1.0 if abs(stated_total - total) < 0.01 else 0.2
+    elif keyword_amounts:
+        confidence = 0.5 if stray_amounts else 0.8
+    else:
+        confidence = 0.5
+
+    if confidence < min_confidence:
+        return None
+
+    return {
+        "tolls": tolls,
+        "total_calculated": total,
+        "source": "text",
+        "confidence": confidence,
+        "text_total": stated_total,
+    }
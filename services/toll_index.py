@@ -0,0 +1,231 @@
+import os
+import threading
+from collections import Counter
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def workbook_signature(path):
+    """(mtime, size) of the file, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def get_index(path):
+    """Returns the shared, up-to-date WorkbookIndex for an Excel path."""
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = WorkbookIndex(path)
+    index.refresh()
+    return index
+
+
+def clear_indexes():
+    with _indexes_lock:
+        _indexes.clear()
+
+
+def _page_key(pdf_name, page_number):
+    try:
+        return str(pdf_name), int(page_number)
+    except (TypeError, ValueError):
+        return None
+
+
+class WorkbookIndex:
+    """
+    In-memory map of a toll workbook: (PDF Name, Page Number) -> toll
+    numbers, toll number -> its row in "Detalle" and "Calculo", and the
+    number of saved entries per PDF.
+
+    The workbook is parsed once. DataService keeps the index in step with
+    its own writes (add/remove + mark_written); a different mtime or size
+    means someone else changed the file, and it is parsed again.
+
+    Tolls whose delete is journaled but not yet written are hidden right
+    away (mark_deleted), also across re-parses, until apply_write() reports
+    their rows gone.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.signature = False  # Never loaded
+        self.by_page = {}
+        self.page_of = {}
+        self.pdf_counts = Counter()
+        self.detail_rows = {}
+        self.calc_rows = {}
+        self.last_number = 0
+        # None until DataService seeds it from the journal
+        self.deleted = None
+        self._lock = threading.RLock()
+
+    def refresh(self):
+        with self._lock:
+            signature = workbook_signature(self.path)
+            if signature != self.signature:
+                self._load()
+                self.signature = signature
+
+    def mark_written(self):
+        """Records the file's new mtime/size after a write by this process."""
+        with self._lock:
+            self.signature = workbook_signature(self.path)
+
+    def apply_write(self, replace, added=(), removed=()):
+        """
+        Swaps in a file written by this process (replace() does the swap)
+        and records its changes. Holding the lock throughout keeps a
+        concurrent refresh() from parsing the new file in between and the
+        changes then being applied twice.
+        """
+        with self._lock:
+            replace()
+            for number in removed:
+                if self.deleted is not None:
+                    self.deleted.discard(number)
+                self.remove(number)
+            deleted = self.deleted or set()
+            # Rows deleted while they were being written stay hidden, and
+            # the rows below them are indexed where they will end up
+            hidden = [entry for entry in added if entry[0] in deleted]
+            for number, pdf_name, page_number, detail_row, calc_row in added:
+                if number in deleted:
+                    continue
+                detail_row -= sum(1 for entry in hidden if entry[3] < detail_row)
+                calc_row -= sum(1 for entry in hidden if entry[4] < calc_row)
+                self.add(number, pdf_name, page_number, detail_row, calc_row)
+            self.signature = workbook_signature(self.path)
+
+    def mark_deleted(self, numbers):
+        """Hides tolls whose rows are still in the file but being deleted."""
+        with self._lock:
+            if self.deleted is None:
+                self.deleted = set()
+            for number in numbers:
+                self.deleted.add(number)
+                self.remove(number)
+
+    def unmark_deleted(self, numbers):
+        """Undoes mark_deleted() (e.g. the delete was not journaled)."""
+        with self._lock:
+            if self.deleted is not None:
+                self.deleted.difference_update(numbers)
+            self.signature = False
+
+    def invalidate(self):
+        """Forces a re-parse on next use."""
+        with self._lock:
+            self.signature = False
+
+    def _load(self):
+        self.by_page = {}
+        self.page_of = {}
+        self.pdf_counts = Counter()
+        self.detail_rows = {}
+        self.calc_rows = {}
+        self.last_number = 0
+        if not os.path.exists(self.path):
+            return
+
+        from openpyxl import load_workbook
+
+        try:
+            wb = load_workbook(self.path, read_only=True)
+        except Exception as e:
+            print(f"Error indexing {self.path}: {e}")
+            return
+        try:
+            if "Calculo" in wb.sheetnames:
+                rows = wb["Calculo"].iter_rows(min_row=3, max_col=1, values_only=True)
+                for row_idx, (number,) in enumerate(rows, start=3):
+                    if isinstance(number, (int, float)):
+                        self.calc_rows[int(number)] = row_idx
+                        self.last_number = max(self.last_number, int(number))
+
+            if "Detalle" in wb.sheetnames:
+                rows = wb["Detalle"].iter_rows(values_only=True)
+                headers = list(next(rows, ()))
+                columns = {name: i for i, name in enumerate(headers)}
+                no_col = columns.get("No.")
+                pdf_col = columns.get("PDF Name")
+                page_col = columns.get("Page Number")
+                if pdf_col is not None:
+                    for row_idx, row in enumerate(rows, start=2):
+                        pdf_name = row[pdf_col] if len(row) > pdf_col else None
+                        if pdf_name is None:
+                            continue
+                        self.pdf_counts[str(pdf_name)] += 1
+                        if no_col is None or page_col is None:
+                            continue
+                        if len(row) <= max(no_col, page_col):
+                            continue
+                        number = row[no_col]
+                        key = _page_key(pdf_name, row[page_col])
+                        if not isinstance(number, (int, float)) or key is None:
+                            continue
+                        self._link(int(number), key)
+                        self.detail_rows[int(number)] = row_idx
+        finally:
+            wb.close()
+        for number in self.deleted or ():
+            self.remove(number)
+
+    def find(self, pdf_name, page_number):
+        """Toll numbers saved for this PDF page (usually zero or one)."""
+        key = _page_key(pdf_name, page_number)
+        with self._lock:
+            return list(self.by_page.get(key, []))
+
+    def processed_pdfs(self):
+        """Names of the PDFs with at least one saved entry."""
+        with self._lock:
+            return set(self.pdf_counts)
+
+    def _link(self, number, key):
+        self.by_page.setdefault(key, []).append(number)
+        self.page_of[number] = key
+
+    def add(self, number, pdf_name, page_number, detail_row, calc_row):
+        with self._lock:
+            if number in self.page_of or number in self.calc_rows:
+                return  # Already indexed, e.g. by a re-parse of the new file
+            if self.deleted and number in self.deleted:
+                return  # Its delete is journaled
+            if pdf_name is not None:
+                self.pdf_counts[str(pdf_name)] += 1
+            key = _page_key(pdf_name, page_number)
+            if key is not None:
+                self._link(number, key)
+            self.detail_rows[number] = detail_row
+            self.calc_rows[number] = calc_row
+            self.last_number = max(self.last_number, number)
+
+    def remove(self, number):
+        """
+        Forgets a toll number whose rows were deleted, moving the rows below
+        it up by one like the sheets themselves.
+        """
+        with self._lock:
+            key = self.page_of.pop(number, None)
+            if key is not None:
+                self.by_page[key].remove(number)
+                if not self.by_page[key]:
+                    del self.by_page[key]
+                self.pdf_counts[key[0]] -= 1
+                if self.pdf_counts[key[0]] <= 0:
+                    del self.pdf_counts[key[0]]
+            for rows in (self.detail_rows, self.calc_rows):
+                removed = rows.pop(number, None)
+                if removed is None:
+                    continue
+                for other, row in rows.items():
+                    if row > removed:
+                        rows[other] = row - 1
+            # Like the original numbering, a deleted last entry is reused
+            self.last_number = max(self.calc_rows, default=0)
@@ -0,0 +1,37 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services import data_service
+from services.data_service import DataService
+from services.journal_service import TollJournal
+from services.toll_index import clear_indexes
+
+
+class DataServiceTestCase(unittest.TestCase):
+    """
+    Points DataService at a temporary folder: no config.json, a journal of
+    its own and a fresh workbook index for every test.
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.journal_path = os.path.join(self.tmp_dir, "journal.jsonl")
+        self.excel_path = os.path.join(
+            self.tmp_dir, f"Peajes {datetime.now().year} Calculo.xlsx"
+        )
+        self.addCleanup(clear_indexes)
+        for patcher in (
+            mock.patch.object(DataService, "load_config", return_value={}),
+            mock.patch.object(data_service, "_journal", TollJournal(self.journal_path)),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
@@ -0,0 +1,52 @@
+import json
+import os
+import sys
+import unittest
+
+from PIL import Image
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.ai_service import TollAnalyzer
+from services.fake_backend import ScriptedBackend
+
+
+def answer_batch(model, images):
+    """Answers multi-page requests with page 1 malformed."""
+    if len(images) == 1:
+        return '{"tolls": [{"amount": 9.0, "quantity": 1}]}'
+    pages = [
+        {"page_index": i, "tolls": [{"amount": float(i + 1), "quantity": 2}]}
+        for i in range(len(images))
+    ]
+    pages[1]["tolls"] = [{"amount": "lots", "quantity": None}]
+    return json.dumps({"pages": pages})
+
+
+class TestAnalyzePages(unittest.TestCase):
+    def setUp(self):
+        self.backend = ScriptedBackend(answer_batch)
+        self.analyzer = TollAnalyzer(backend=self.backend)
+        self.images = [Image.new("RGB", (20, 20), "white") for _ in range(3)]
+
+    def test_results_split_per_page_and_bad_page_retried(self):
+        results = self.analyzer.analyze_pages(self.images, model="m1")
+
+        self.assertEqual([images for _, images, _ in self.backend.calls], [3, 1])
+        self.assertAlmostEqual(results[0]["total_calculated"], 2.0)
+        self.assertAlmostEqual(results[1]["total_calculated"], 9.0)
+        self.assertAlmostEqual(results[2]["total_calculated"], 6.0)
+
+    def test_failed_pages_reported_without_retry(self):
+        results = self.analyzer.analyze_pages(
+            self.images, model="m1", retry_failed=False
+        )
+
+        self.assertEqual([images for _, images, _ in self.backend.calls], [3])
+        self.assertIn("error", results[1])
+        self.assertNotIn("error", results[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from PIL import Image
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.ai_cache import AnalysisCache
+from services.ai_service import TollAnalyzer
+from services.fake_backend import FakeBackend
+
+
+class TestAnalysisCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, "ai_cache.sqlite")
+        self.image = Image.new("RGB", (20, 30), "white")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_second_analysis_is_served_from_cache(self):
+        cache = AnalysisCache(self.db_path)
+        backend = FakeBackend(latency_s=0, per_page_latency_s=0)
+        analyzer = TollAnalyzer(cache=cache, backend=backend)
+
+        first = analyzer.analyze_page(self.image, model="m1")
+        second = analyzer.analyze_page(self.image, model="m1")
+
+        self.assertEqual(backend.stats["requests"], 1)
+        self.assertEqual(second["tolls"], first["tolls"])
+        self.assertAlmostEqual(second["total_calculated"], first["total_calculated"])
+        self.assertTrue(second.get("cached"))
+        self.assertEqual(cache.stats()["hits"], 1)
+        cache.close()
+
+    def test_results_persist_and_key_includes_model(self):
+        cache = AnalysisCache(self.db_path)
+        key = AnalysisCache.make_key(self.image, "m1", 1)
+        cache.put(key, {"tolls": [], "total_calculated": 0.0})
+        cache.close()
+
+        reopened = AnalysisCache(self.db_path)
+        self.assertIsNotNone(reopened.get(key))
+        self.assertIsNone(reopened.get(AnalysisCache.make_key(self.image, "m2", 1)))
+        reopened.close()
+
+    def test_eviction_keeps_max_entries(self):
+        cache = AnalysisCache(self.db_path, max_entries=2)
+        for i in range(3):
+            cache.put(f"k{i}", {"tolls": [], "total_calculated": float(i)})
+
+        self.assertEqual(cache.stats()["entries"], 2)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
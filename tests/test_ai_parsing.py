@@ -0,0 +1,158 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.ai_parsing import (
+    StreamingTollParser,
+    extract_json_object,
+    normalize_tolls,
+)
+from services.ai_service import TollAnalyzer
+from services.fake_backend import ScriptedBackend
+from services.gemini_client import RequestGate
+
+
+class TestResponseParsing(unittest.TestCase):
+    def test_extracts_object_from_fenced_or_chatty_text(self):
+        self.assertEqual(extract_json_object('```json\n{"tolls": []}\n```'), {"tolls": []})
+        self.assertEqual(
+            extract_json_object('Sure! Here it is: {"tolls": [{"amount": 1}]} Done.'),
+            {"tolls": [{"amount": 1}]},
+        )
+        with self.assertRaises(ValueError):
+            extract_json_object("no json here {broken")
+
+    def test_truncated_response_does_not_yield_nested_entry(self):
+        truncated = '{"tolls": [{"amount": 5.5, "quantity": 2}, {"amo'
+        with self.assertRaises(ValueError):
+            extract_json_object(truncated, ["tolls"])
+
+    def test_normalize_types_and_merge_duplicates(self):
+        tolls, dropped = normalize_tolls(
+            [
+                {"amount": "5,50", "quantity": "2"},
+                {"amount": 5.5, "quantity": 1},
+                {"amount": "3.00", "quantity": 1.0},
+                {"amount": "n/a", "quantity": 1},
+                {"amount": 4.0, "quantity": 1.5},
+                "garbage",
+            ]
+        )
+        self.assertEqual(
+            tolls, [{"amount": 5.5, "quantity": 3}, {"amount": 3.0, "quantity": 1}]
+        )
+        self.assertEqual(dropped, 3)
+
+    def test_ambiguous_thousands_separator_is_dropped(self):
+        tolls, dropped = normalize_tolls(
+            [
+                {"amount": "1,234", "quantity": 1},
+                {"amount": "1.234", "quantity": 1},
+                {"amount": "7,5", "quantity": 1},
+                {"amount": "$12", "quantity": 1},
+            ]
+        )
+        self.assertEqual(
+            tolls, [{"amount": 7.5, "quantity": 1}, {"amount": 12.0, "quantity": 1}]
+        )
+        self.assertEqual(dropped, 2)
+
+
+class TestStreamingParser(unittest.TestCase):
+    def test_entries_are_emitted_as_soon_as_complete(self):
+        parser = StreamingTollParser()
+        self.assertEqual(parser.feed('{"tolls": [{"amount": 5.5, "qu'), [])
+        self.assertEqual(
+            parser.feed('antity": 2}, {"amount": "3,00", '),
+            [{"amount": 5.5, "quantity": 2}],
+        )
+        self.assertEqual(
+            parser.feed('"quantity": 1}]}'), [{"amount": 3.0, "quantity": 1}]
+        )
+        self.assertEqual(parser.feed(""), [])
+
+    def test_ignores_braces_inside_strings(self):
+        parser = StreamingTollParser()
+        tolls = parser.feed('{"tolls": [{"note": "}{", "amount": 1, "quantity": 1}]}')
+        self.assertEqual(tolls, [{"amount": 1.0, "quantity": 1}])
+
+
+class TestAnalyzerParsing(unittest.TestCase):
+    def setUp(self):
+        self.image = Image.new("RGB", (10, 10), "white")
+
+    def test_requests_schema_constrained_json(self):
+        backend = ScriptedBackend('{"tolls": [{"amount": 2.5, "quantity": 2}]}')
+        analyzer = TollAnalyzer(backend=backend)
+
+        result = analyzer.analyze_page(self.image, model="m1")
+
+        _, _, config = backend.calls[0]
+        self.assertEqual(config.response_mime_type, "application/json")
+        self.assertAlmostEqual(result["total_calculated"], 5.0)
+
+    def test_unparseable_response_is_retried_and_counted(self):
+        backend = ScriptedBackend(
+            ["I could not read it", '{"tolls": [{"amount": 1.0, "quantity": 1}]}']
+        )
+        analyzer = TollAnalyzer(backend=backend)
+
+        result = analyzer.analyze_page(self.image, model="m1")
+
+        self.assertNotIn("error", result)
+        rates = analyzer.response_rates()
+        self.assertEqual(rates["requests"], 2)
+        self.assertEqual(rates["parse_failures"], 1)
+        self.assertEqual(rates["retries"], 1)
+
+    def test_stream_reports_entries_then_merged_result(self):
+        backend = ScriptedBackend(
+            [
+                [
+                    '{"tolls": [{"amount": 2.5, "quantity": 1},',
+                    ' {"amount": 2.5, "quantity": 1}, {"amount": 4, "quantity": 1}',
+                    "]}",
+                ]
+            ]
+        )
+        analyzer = TollAnalyzer(backend=backend)
+        seen = []
+
+        result = analyzer.analyze_page_stream(self.image, model="m1", on_toll=seen.append)
+
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(
+            result["tolls"], [{"amount": 2.5, "quantity": 2}, {"amount": 4.0, "quantity": 1}]
+        )
+        self.assertAlmostEqual(result["total_calculated"], 9.0)
+
+    def test_retried_stream_signals_restart(self):
+        backend = ScriptedBackend(
+            [
+                ['{"tolls": [{"amount": 2.5, "quantity": 1},', Exception("429")],
+                ['{"tolls": [{"amount": 2.5, "quantity": 1}]}'],
+            ]
+        )
+        analyzer = TollAnalyzer(gate=RequestGate(), backend=backend)
+        seen = []
+
+        with mock.patch("services.gemini_client.BACKOFF_BASE_S", 0.01):
+            result = analyzer.analyze_page_stream(
+                self.image,
+                model="m1",
+                on_toll=seen.append,
+                on_restart=lambda: seen.append("restart"),
+            )
+
+        self.assertEqual(seen[1:], ["restart", {"amount": 2.5, "quantity": 1}])
+        self.assertAlmostEqual(result["total_calculated"], 2.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
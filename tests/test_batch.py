@@ -0,0 +1,112 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.batch_service import BatchAnalyzer, BatchResultsStore
+from tests.test_render_cache import make_pdf
+
+
+class FlakyAnalyzer:
+    """Fails the first `failures` calls with a quota error."""
+
+    def __init__(self, failures=0, error="429 RESOURCE_EXHAUSTED"):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+
+    def analyze_page(self, image_data, model="default"):
+        self.calls += 1
+        if self.calls <= self.failures:
+            return {"error": self.error, "tolls": []}
+        return {"tolls": [{"amount": 2.5, "quantity": 2}], "total_calculated": 5.0}
+
+    def analyze_pages(self, images, model="default", retry_failed=True):
+        self.calls += 1
+        results = [
+            {"tolls": [{"amount": 1.0, "quantity": 1}], "total_calculated": 1.0}
+            for _ in images
+        ]
+        results[0] = {"error": "Missing from batch response", "tolls": []}
+        return results
+
+
+class TestBatchAnalyzer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        make_pdf(os.path.join(self.tmp_dir, "file2.pdf"), pages=2)
+        make_pdf(os.path.join(self.tmp_dir, "file10.pdf"), pages=1)
+        self.results_path = os.path.join(self.tmp_dir, "results.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def make_batch(self, analyzer, **kwargs):
+        kwargs.setdefault("requests_per_minute", 60000)
+        # The sample PDFs have a text layer; force the AI path here
+        kwargs.setdefault("use_text_layer", False)
+        return BatchAnalyzer(
+            analyzer, store=BatchResultsStore(self.results_path), zoom=0.5, **kwargs
+        )
+
+    def test_all_pages_analyzed_and_run_resumes(self):
+        analyzer = FlakyAnalyzer()
+        stats = self.make_batch(analyzer, concurrency=2).run(self.tmp_dir)
+        self.assertEqual(stats["analyzed"], 3)
+
+        again = self.make_batch(analyzer).run(self.tmp_dir)
+        self.assertEqual(again["skipped"], 3)
+        self.assertEqual(again["analyzed"], 0)
+        self.assertEqual(analyzer.calls, 3)
+
+    def test_same_file_names_in_another_folder_are_analyzed(self):
+        self.make_batch(FlakyAnalyzer()).run(self.tmp_dir)
+        next_month = os.path.join(self.tmp_dir, "next")
+        os.mkdir(next_month)
+        make_pdf(os.path.join(next_month, "file2.pdf"), pages=2)
+
+        analyzer = FlakyAnalyzer()
+        stats = self.make_batch(analyzer).run(next_month)
+        self.assertEqual(stats["analyzed"], 2)
+        self.assertEqual(stats["skipped"], 0)
+
+    def test_transient_errors_are_retried(self):
+        analyzer = FlakyAnalyzer(failures=2)
+        stats = self.make_batch(analyzer, concurrency=1, backoff_base=0.01).run(
+            self.tmp_dir
+        )
+        self.assertEqual(stats["retries"], 2)
+        self.assertEqual(stats["analyzed"], 3)
+        self.assertEqual(stats["failed"], 0)
+
+    def test_permanent_errors_are_recorded_and_retried_next_run(self):
+        analyzer = FlakyAnalyzer(failures=1, error="Invalid JSON")
+        stats = self.make_batch(analyzer, concurrency=1).run(self.tmp_dir)
+        self.assertEqual(stats["failed"], 1)
+        self.assertEqual(stats["retries"], 0)
+
+        store = BatchResultsStore(self.results_path)
+        self.assertEqual(len(store.completed), 2)
+
+    def test_text_layer_pages_skip_the_ai(self):
+        analyzer = FlakyAnalyzer()
+        stats = self.make_batch(analyzer, use_text_layer=True).run(self.tmp_dir)
+        self.assertEqual(stats["from_text"], 3)
+        self.assertEqual(analyzer.calls, 0)
+
+    def test_pages_grouped_per_request_with_individual_fallback(self):
+        analyzer = FlakyAnalyzer()
+        stats = self.make_batch(analyzer, concurrency=1, pages_per_request=3).run(
+            self.tmp_dir
+        )
+        # One grouped request plus one retry for the page it missed
+        self.assertEqual(analyzer.calls, 2)
+        self.assertEqual(stats["analyzed"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
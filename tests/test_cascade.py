@@ -0,0 +1,77 @@
+import os
+import sys
+import unittest
+
+from PIL import Image
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.ai_service import TollAnalyzer
+from services.fake_backend import ScriptedBackend
+
+CHEAP_OK = '{"tolls": [{"amount": 5.50, "quantity": 2}]}'
+EMPTY = '{"tolls": []}'
+ABSURD = '{"tolls": [{"amount": 55000000, "quantity": 1}]}'
+
+
+class TestModelCascade(unittest.TestCase):
+    def make_analyzer(self, replies):
+        return TollAnalyzer(
+            cascade={
+                "models": ["cheap", "strong"],
+                "cost_per_call": {"cheap": 0.001, "strong": 0.01},
+            },
+            backend=ScriptedBackend(replies),
+        )
+
+    @staticmethod
+    def models_called(analyzer):
+        return [model for model, _, _ in analyzer.client.calls]
+
+    def test_plausible_cheap_result_is_not_escalated(self):
+        analyzer = self.make_analyzer({"cheap": CHEAP_OK, "strong": CHEAP_OK})
+        result = analyzer.analyze_cascade(Image.new("RGB", (50, 50), "white"))
+
+        self.assertEqual(result["model"], "cheap")
+        self.assertEqual(result["escalations"], 0)
+        self.assertEqual(self.models_called(analyzer), ["cheap"])
+
+    def test_empty_or_implausible_results_escalate(self):
+        for reply in (EMPTY, ABSURD):
+            analyzer = self.make_analyzer({"cheap": reply, "strong": CHEAP_OK})
+            result = analyzer.analyze_cascade(Image.new("RGB", (50, 50), "white"))
+
+            self.assertEqual(result["model"], "strong")
+            self.assertEqual(result["total_calculated"], 11.0)
+            self.assertEqual(self.models_called(analyzer), ["cheap", "strong"])
+
+    def test_text_layer_total_mismatch_escalates(self):
+        analyzer = self.make_analyzer({"cheap": CHEAP_OK, "strong": CHEAP_OK})
+        result = analyzer.analyze_cascade(
+            Image.new("RGB", (50, 50), "white"), text_total=16.5
+        )
+
+        # Neither model agrees with the printed total
+        self.assertEqual(result["escalations"], 1)
+        self.assertTrue(result["low_confidence"])
+
+    def test_empty_cascade_returns_an_error(self):
+        analyzer = TollAnalyzer(cascade={"models": []})
+        result = analyzer.analyze_cascade(Image.new("RGB", (50, 50), "white"))
+        self.assertEqual(result["error"], "No models configured")
+
+    def test_report_tracks_escalation_rate_and_cost(self):
+        analyzer = self.make_analyzer({"cheap": EMPTY, "strong": CHEAP_OK})
+        analyzer.analyze_cascade(Image.new("RGB", (50, 50), "white"))
+        analyzer.analyze_cascade(Image.new("RGB", (60, 60), "white"))
+
+        report = analyzer.cascade_report()
+        self.assertEqual(report["pages"], 2)
+        self.assertEqual(report["escalation_rate"], 1.0)
+        self.assertAlmostEqual(report["cost_per_page"], 0.011)
+        self.assertEqual(report["models"]["strong"]["calls"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.document_pool import DocumentPool
+from services.pdf_service import PDFHandler
+from tests.test_render_cache import make_pdf
+
+
+class TestDocumentPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for name in ("a.pdf", "b.pdf", "c.pdf"):
+            path = os.path.join(self.tmp_dir, name)
+            make_pdf(path, pages=1)
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_switching_back_reuses_open_document(self):
+        handler = PDFHandler(document_pool=DocumentPool(max_size=3))
+        a, b, _ = self.paths
+
+        handler.open_pdf(a)
+        first_doc = handler.doc
+        handler.open_pdf(b)
+        handler.open_pdf(a)
+
+        self.assertIs(handler.doc, first_doc)
+        stats = handler.document_pool.stats()
+        self.assertEqual(stats["opens"], 2)
+        self.assertEqual(stats["reuses"], 1)
+        handler.close()
+
+    def test_lru_eviction_closes_document(self):
+        pool = DocumentPool(max_size=2)
+        a, b, c = self.paths
+
+        doc_a = pool.acquire(a)
+        pool.acquire(b)
+        pool.acquire(c)
+
+        self.assertNotIn(a, pool)
+        self.assertTrue(doc_a.is_closed)
+        self.assertEqual(len(pool), 2)
+        pool.close_all()
+
+    def test_idle_documents_are_released(self):
+        pool = DocumentPool(max_size=3, idle_timeout=0.01)
+        a, b, _ = self.paths
+
+        doc_a = pool.acquire(a)
+        pool._docs[a][1] -= 1  # Pretend it has been idle for a second
+        pool.acquire(b)
+
+        self.assertTrue(doc_a.is_closed)
+        self.assertNotIn(a, pool)
+        pool.close_all()
+
+
+if __name__ == "__main__":
+    unittest.main()
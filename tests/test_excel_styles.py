@@ -0,0 +1,57 @@
+import os
+import sys
+import unittest
+
+from openpyxl import load_workbook
+from openpyxl.styles import PatternFill
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.data_service import CELL_STYLE, HEADER_STYLE, DataService
+from tests.data_service_case import DataServiceTestCase
+
+
+class TestExcelStyles(DataServiceTestCase):
+    def save(self, page):
+        data = {"PDF Name": "a.pdf", "Page Number": page, "Total Amount": 1.0}
+        return DataService.save_toll_entry(self.tmp_dir, data)
+
+    def test_new_rows_use_shared_named_styles(self):
+        self.save(1)
+        self.save(2)
+
+        wb = load_workbook(self.excel_path)
+        self.assertEqual(wb.style_names.count(CELL_STYLE), 1)
+        self.assertEqual(wb["Calculo"]["A2"].style, HEADER_STYLE)
+        self.assertEqual(wb["Calculo"]["B4"].style, CELL_STYLE)
+        self.assertEqual(wb["Detalle"]["A1"].style, HEADER_STYLE)
+        self.assertEqual(wb["Detalle"]["A3"].style, CELL_STYLE)
+        self.assertEqual(wb["Detalle"]["A3"].alignment.horizontal, "center")
+
+    def test_existing_rows_keep_custom_formatting(self):
+        self.save(1)
+        wb = load_workbook(self.excel_path)
+        wb["Calculo"]["B3"].fill = PatternFill("solid", fgColor="FFFF00")
+        wb.save(self.excel_path)
+
+        self.save(2)
+
+        wb = load_workbook(self.excel_path)
+        self.assertEqual(wb["Calculo"]["B3"].fill.fgColor.rgb, "00FFFF00")
+
+    def test_restyle_repairs_unstyled_rows(self):
+        self.save(1)
+        wb = load_workbook(self.excel_path)
+        wb["Detalle"]["B2"].style = "Normal"
+        wb.save(self.excel_path)
+
+        success, _ = DataService.restyle_workbook(self.tmp_dir)
+
+        self.assertTrue(success)
+        wb = load_workbook(self.excel_path)
+        self.assertEqual(wb["Detalle"]["B2"].style, CELL_STYLE)
+
+
+if __name__ == "__main__":
+    unittest.main()
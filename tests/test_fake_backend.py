@@ -0,0 +1,73 @@
+import os
+import sys
+import unittest
+
+from PIL import Image, ImageDraw
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.ai_service import TollAnalyzer
+from services.fake_backend import FakeAPIError, FakeBackend
+from services.gemini_client import RequestGate
+
+
+def page_image(label):
+    img = Image.new("RGB", (200, 100), "white")
+    ImageDraw.Draw(img).text((10, 40), label, fill="black")
+    return img
+
+
+class TestFakeBackend(unittest.TestCase):
+    def make_analyzer(self, **options):
+        options.setdefault("latency_s", 0.001)
+        options.setdefault("per_page_latency_s", 0.0)
+        backend = FakeBackend(**options)
+        return TollAnalyzer(backend=backend, gate=RequestGate(max_retries=0)), backend
+
+    def test_answers_are_deterministic_per_page(self):
+        analyzer, _ = self.make_analyzer()
+        first = analyzer.analyze_page(page_image("page 1"))
+        again = analyzer.analyze_page(page_image("page 1"))
+
+        self.assertNotIn("error", first)
+        self.assertTrue(first["tolls"])
+        self.assertEqual(first, again)
+
+    def test_multi_page_requests_answer_every_page(self):
+        analyzer, backend = self.make_analyzer()
+        images = [page_image(f"page {n}") for n in range(3)]
+
+        results = analyzer.analyze_pages(images)
+
+        self.assertEqual(backend.stats["requests"], 1)
+        for img, result in zip(images, results):
+            self.assertEqual(result["tolls"], analyzer.analyze_page(img)["tolls"])
+
+    def test_injected_quota_errors_surface_as_429(self):
+        analyzer, backend = self.make_analyzer(error_429_rate=1.0)
+        result = analyzer.analyze_page(page_image("page 1"))
+
+        self.assertIn("429", result["error"])
+        self.assertEqual(backend.stats["rejected_429"], 1)
+
+    def test_server_rate_limit_rejects_excess_requests(self):
+        backend = FakeBackend(latency_s=0.0, per_page_latency_s=0.0, requests_per_minute=2)
+        backend.respond("m", [])
+        backend.respond("m", [])
+        with self.assertRaises(FakeAPIError):
+            backend.respond("m", [])
+
+    def test_malformed_json_is_detected_and_retried(self):
+        analyzer, backend = self.make_analyzer(malformed_rate=0.5, seed=3)
+        for n in range(6):
+            analyzer.analyze_page(page_image(f"page {n}"))
+
+        rates = analyzer.response_rates()
+        self.assertGreater(backend.stats["malformed"], 0)
+        self.assertEqual(rates["parse_failures"], backend.stats["malformed"])
+        self.assertGreater(rates["retries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services import gemini_client
+from services.gemini_client import RequestGate, is_quota_error
+
+
+class QuotaError(Exception):
+    code = 429
+
+
+class TestRequestGate(unittest.TestCase):
+    def setUp(self):
+        self.original_base = gemini_client.BACKOFF_BASE_S
+        gemini_client.BACKOFF_BASE_S = 0.01
+
+    def tearDown(self):
+        gemini_client.BACKOFF_BASE_S = self.original_base
+
+    def test_concurrency_is_capped(self):
+        gate = RequestGate(max_concurrent=2)
+        lock = threading.Lock()
+        active = [0]
+        peak = [0]
+
+        def work():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.02)
+            with lock:
+                active[0] -= 1
+            return "ok"
+
+        threads = [threading.Thread(target=gate.call, args=(work,)) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(peak[0], 2)
+        metrics = gate.metrics()
+        self.assertEqual(metrics["requests"], 6)
+        self.assertEqual(metrics["in_flight"], 0)
+        self.assertEqual(metrics["queued"], 0)
+        self.assertIsNotNone(metrics["p95_s"])
+
+    def test_quota_errors_back_off_and_retry(self):
+        gate = RequestGate(requests_per_minute=600, max_retries=3)
+        failures = [2]
+
+        def flaky():
+            if failures[0]:
+                failures[0] -= 1
+                raise QuotaError("RESOURCE_EXHAUSTED")
+            return "ok"
+
+        self.assertEqual(gate.call(flaky), "ok")
+        metrics = gate.metrics()
+        self.assertEqual(metrics["throttled"], 2)
+        self.assertLess(metrics["requests_per_minute"], 600)
+
+    def test_other_errors_are_not_retried(self):
+        gate = RequestGate()
+        calls = []
+
+        def broken():
+            calls.append(1)
+            raise ValueError("bad request")
+
+        with self.assertRaises(ValueError):
+            gate.call(broken)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(gate.metrics()["errors"], 1)
+
+    def test_quota_error_detection(self):
+        self.assertTrue(is_quota_error(QuotaError("x")))
+        self.assertTrue(is_quota_error(Exception("503 UNAVAILABLE")))
+        self.assertFalse(is_quota_error(Exception("400 INVALID_ARGUMENT")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services import data_service
+from services.data_service import DataService
+from services.journal_service import TollJournal
+from services.toll_index import clear_indexes
+from tests.data_service_case import DataServiceTestCase
+
+
+class TestTollJournal(DataServiceTestCase):
+    def save(self, pdf_name, page, amount):
+        data = {"PDF Name": pdf_name, "Page Number": page, "Total Amount": amount}
+        return DataService.save_toll_entry(self.tmp_dir, data, materialize=False)
+
+    def test_saves_are_journaled_until_materialized(self):
+        self.assertTrue(self.save("a.pdf", 1, 10.0)[0])
+        self.assertTrue(self.save("b.pdf", 2, "20.50")[0])
+
+        self.assertFalse(os.path.exists(self.excel_path))
+        self.assertTrue(DataService.has_toll_entry("b.pdf", 2, self.tmp_dir))
+        self.assertEqual(DataService.get_processed_tolls(self.tmp_dir), {"a.pdf", "b.pdf"})
+
+        success, _ = DataService.materialize(self.tmp_dir)
+        self.assertTrue(success)
+        self.assertFalse(os.path.exists(self.journal_path))
+
+        df_calc = pd.read_excel(self.excel_path, sheet_name="Calculo", skiprows=1)
+        self.assertEqual(df_calc["Numero de Peajes"].tolist(), [1, 2])
+        self.assertEqual(df_calc["Total en BS"].tolist(), [10.0, 20.5])
+        df_detail = pd.read_excel(self.excel_path, sheet_name="Detalle")
+        self.assertEqual(df_detail["PDF Name"].tolist(), ["a.pdf", "b.pdf"])
+
+    def test_numbering_continues_across_flushes_and_restarts(self):
+        self.save("a.pdf", 1, 1.0)
+        DataService.materialize(self.tmp_dir)
+        self.save("a.pdf", 2, 2.0)
+
+        # A new process replays the journal and reads the workbook once
+        data_service._journal = TollJournal(self.journal_path)
+        clear_indexes()
+        self.save("a.pdf", 3, 3.0)
+        DataService.materialize(self.tmp_dir)
+
+        df_calc = pd.read_excel(self.excel_path, sheet_name="Calculo", skiprows=1)
+        self.assertEqual(df_calc["Numero de Peajes"].tolist(), [1, 2, 3])
+
+    def test_replayed_entries_are_not_written_twice(self):
+        self.save("a.pdf", 1, 1.0)
+        records = DataService.get_journal().pending()
+        DataService.materialize(self.tmp_dir)
+
+        # Crash after the workbook was saved but before the journal was trimmed
+        journal = DataService.get_journal()
+        for record in records:
+            journal.append(record)
+        DataService.materialize(self.tmp_dir)
+
+        df_calc = pd.read_excel(self.excel_path, sheet_name="Calculo", skiprows=1)
+        self.assertEqual(len(df_calc), 1)
+
+    def test_external_delete_of_workbook_restarts_numbering(self):
+        self.save("a.pdf", 1, 1.0)
+        self.save("a.pdf", 2, 2.0)
+        DataService.materialize(self.tmp_dir)
+        os.remove(self.excel_path)
+
+        self.save("b.pdf", 1, 5.0)
+        DataService.materialize(self.tmp_dir)
+
+        df_calc = pd.read_excel(self.excel_path, sheet_name="Calculo", skiprows=1)
+        self.assertEqual(df_calc["Numero de Peajes"].tolist(), [1])
+
+    def test_delete_includes_pending_entries(self):
+        self.save("a.pdf", 1, 1.0)
+        self.save("a.pdf", 2, 2.0)
+
+        success, _ = DataService.delete_toll_entry("a.pdf", 1, self.tmp_dir)
+
+        self.assertTrue(success)
+        self.assertFalse(DataService.has_toll_entry("a.pdf", 1, self.tmp_dir))
+        self.assertTrue(DataService.has_toll_entry("a.pdf", 2, self.tmp_dir))
+
+
+if __name__ == "__main__":
+    unittest.main()
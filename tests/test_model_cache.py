@@ -0,0 +1,51 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services import ai_service
+from services.ai_service import FALLBACK_MODELS, load_cached_models, refresh_model_cache
+
+
+class TestModelCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "models_cache.json")
+        self.original_list_models = ai_service.list_models
+
+    def tearDown(self):
+        ai_service.list_models = self.original_list_models
+        shutil.rmtree(self.tmp_dir)
+
+    def test_missing_cache_falls_back_and_is_stale(self):
+        models, fresh = load_cached_models(self.path)
+        self.assertEqual(models, FALLBACK_MODELS)
+        self.assertFalse(fresh)
+
+    def test_refresh_saves_models_until_ttl_expires(self):
+        ai_service.list_models = lambda: ["model-a", "model-b"]
+        self.assertEqual(refresh_model_cache(self.path), ["model-a", "model-b"])
+
+        self.assertEqual(load_cached_models(self.path), (["model-a", "model-b"], True))
+        self.assertFalse(load_cached_models(self.path, ttl=0)[1])
+
+    def test_failed_refresh_keeps_previous_list(self):
+        with open(self.path, "w") as f:
+            json.dump({"fetched_at": time.time() - 10 ** 6, "models": ["old"]}, f)
+
+        def offline():
+            raise ConnectionError("offline")
+
+        ai_service.list_models = offline
+        self.assertIsNone(refresh_model_cache(self.path))
+        self.assertEqual(load_cached_models(self.path), (["old"], False))
+
+
+if __name__ == "__main__":
+    unittest.main()
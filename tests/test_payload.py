@@ -0,0 +1,68 @@
+import io
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+from PIL import Image, ImageDraw
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services import ai_service
+from services.ai_service import TollAnalyzer
+from services.fake_backend import FakeBackend
+from services.payload_service import encode_page_image, payload_options
+
+
+def make_page(width=1200, height=1600):
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    draw.rectangle((300, 400, 700, 900), fill="black")
+    return img
+
+
+class TestPayloadEncoding(unittest.TestCase):
+    def test_grayscale_trim_and_cap(self):
+        options = payload_options({"max_dimension": 200})
+        data, mime_type = encode_page_image(make_page(), options)
+        decoded = Image.open(io.BytesIO(data))
+
+        self.assertEqual(mime_type, "image/png")
+        self.assertEqual(decoded.mode, "L")
+        self.assertLessEqual(max(decoded.size), 200)
+        # Trimmed to the drawn box (plus padding), so taller than wide
+        self.assertGreater(decoded.height, decoded.width)
+
+    def test_jpeg_is_smaller_than_untouched_png(self):
+        page = make_page()
+        raw, _ = encode_page_image(
+            page,
+            payload_options(
+                {"grayscale": False, "trim_margins": False, "max_dimension": None}
+            ),
+        )
+        small, mime_type = encode_page_image(
+            page, payload_options({"format": "jpg", "quality": 60})
+        )
+
+        self.assertEqual(mime_type, "image/jpeg")
+        self.assertLess(len(small), len(raw))
+
+    def test_logged_latency_includes_encoding(self):
+        def slow_encode(image, options):
+            time.sleep(0.05)
+            return encode_page_image(image, options)
+
+        analyzer = TollAnalyzer(
+            backend=FakeBackend(latency_s=0, per_page_latency_s=0)
+        )
+        with mock.patch.object(ai_service, "encode_page_image", slow_encode):
+            analyzer.analyze_page(make_page(200, 300), model="m1")
+
+        self.assertGreaterEqual(analyzer.request_log[-1]["latency_s"], 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.prefetch_service import PagePrefetcher
+from services.render_cache import RenderCache
+from tests.test_render_cache import make_pdf
+
+
+class TestPagePrefetcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pdf_a = os.path.join(self.tmp_dir, "a.pdf")
+        self.pdf_b = os.path.join(self.tmp_dir, "b.pdf")
+        make_pdf(self.pdf_a, pages=2)
+        make_pdf(self.pdf_b, pages=2)
+        self.cache = RenderCache()
+        self.prefetcher = PagePrefetcher(self.cache)
+
+    def tearDown(self):
+        self.prefetcher.shutdown()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_prefetch_fills_shared_cache(self):
+        self.prefetcher.prefetch([(self.pdf_a, 1, 1.0), (self.pdf_b, 0, 1.0)])
+        self.prefetcher.executor.submit(lambda: None).result(timeout=10)
+
+        self.assertIn(RenderCache.make_key(self.pdf_a, 1, 1.0), self.cache)
+        self.assertIn(RenderCache.make_key(self.pdf_b, 0, 1.0), self.cache)
+
+    def test_out_of_range_page_is_ignored(self):
+        self.prefetcher.prefetch([(self.pdf_a, 5, 1.0)])
+        self.prefetcher.executor.submit(lambda: None).result(timeout=10)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_cancel_drops_pending_jobs(self):
+        # Hold the worker busy so the prefetch stays queued
+        gate = threading.Event()
+        self.prefetcher.executor.submit(gate.wait)
+        self.prefetcher.prefetch([(self.pdf_a, 0, 1.0)])
+        self.prefetcher.cancel()
+        gate.set()
+        self.prefetcher.executor.submit(lambda: None).result(timeout=10)
+
+        self.assertEqual(len(self.cache), 0)
+
+    def test_render_returns_page_and_survives_cancel(self):
+        future = self.prefetcher.render(self.pdf_a, 0, 1.0)
+        self.prefetcher.cancel()
+        rendered = future.result(timeout=10)
+
+        self.assertIsNotNone(rendered)
+        self.assertIn(RenderCache.make_key(self.pdf_a, 0, 1.0), self.cache)
+
+    def test_render_tile_caches_the_tile(self):
+        tile = self.prefetcher.render_tile(self.pdf_a, 0, 3.0, 0, 0, 128)
+        self.assertIsNotNone(tile.result(timeout=10))
+        key = RenderCache.make_key(self.pdf_a, 0, 3.0, "rgb", tile=(0, 0, 128))
+        self.assertIn(key, self.cache)
+
+        outside = self.prefetcher.render_tile(self.pdf_a, 0, 3.0, 99, 0, 128)
+        self.assertIsNone(outside.result(timeout=10))
+
+    def test_page_count_is_read_on_the_worker_and_remembered(self):
+        self.assertEqual(self.prefetcher.page_count(self.pdf_b).result(timeout=10), 2)
+        missing = os.path.join(self.tmp_dir, "missing.pdf")
+        self.assertEqual(self.prefetcher.page_count(missing).result(timeout=10), 0)
+
+        self.assertEqual(self.prefetcher.page_counts, {self.pdf_b: 2, missing: 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import fitz
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.pdf_service import PDFHandler
+from services.render_cache import RenderCache
+
+
+def make_pdf(path, pages=3):
+    doc = fitz.open()
+    for i in range(pages):
+        page = doc.new_page(width=200, height=300)
+        page.insert_text((20, 50), f"Peaje {i + 1}: 5.50")
+    doc.save(path)
+    doc.close()
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pdf_path = os.path.join(self.tmp_dir, "sample.pdf")
+        make_pdf(self.pdf_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_repeat_render_is_a_hit(self):
+        handler = PDFHandler(render_cache=RenderCache())
+        handler.open_pdf(self.pdf_path)
+
+        first = handler.get_page_pnm(0, zoom=1.0)
+        second = handler.get_page_pnm(0, zoom=1.0)
+
+        self.assertIs(first, second)
+        stats = handler.render_cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        handler.close()
+
+    def test_zoom_and_colorspace_are_separate_entries(self):
+        handler = PDFHandler(render_cache=RenderCache())
+        handler.open_pdf(self.pdf_path)
+
+        rgb = handler.get_page_image(0, zoom=1.0)
+        zoomed = handler.get_page_image(0, zoom=2.0)
+        gray = handler.get_page_image(0, zoom=1.0, colorspace="gray")
+
+        self.assertEqual(zoomed.width, rgb.width * 2)
+        self.assertEqual(gray.mode, "L")
+        self.assertEqual(len(handler.render_cache), 3)
+        handler.close()
+
+    def test_lru_eviction_respects_budget(self):
+        handler = PDFHandler(render_cache=RenderCache())
+        handler.open_pdf(self.pdf_path)
+        page_bytes = RenderCache._size_of(handler.get_page_pnm(0))
+
+        cache = RenderCache(max_bytes=page_bytes * 2)
+        handler.render_cache = cache
+        handler.get_page_pnm(0)
+        handler.get_page_pnm(1)
+        handler.get_page_pnm(0)  # Touch page 0 so page 1 is the LRU entry
+        handler.get_page_pnm(2)
+
+        key = lambda n: RenderCache.make_key(self.pdf_path, n, 1.0)
+        self.assertIn(key(0), cache)
+        self.assertNotIn(key(1), cache)
+        self.assertIn(key(2), cache)
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+        self.assertEqual(cache.evictions, 1)
+        handler.close()
+
+    def test_pil_path_decodes_cached_pnm(self):
+        handler = PDFHandler(render_cache=RenderCache())
+        handler.open_pdf(self.pdf_path)
+
+        rendered = handler.get_page_pnm(0, zoom=1.5)
+        img = handler.get_page_image(0, zoom=1.5)
+
+        self.assertTrue(rendered.data.startswith(b"P6"))
+        self.assertEqual(img.mode, "RGB")
+        self.assertEqual(img.size, (rendered.width, rendered.height))
+        self.assertEqual(handler.render_cache.misses, 1)
+        handler.close()
+
+    def test_tiles_cover_page_and_are_cached_per_zoom(self):
+        handler = PDFHandler(render_cache=RenderCache())
+        handler.open_pdf(self.pdf_path)
+        width, height = handler.get_page_size(0)
+
+        # 200x300pt at 3x = 600x900px -> 2 x 2 tiles of 512px
+        tiles = {
+            (col, row): handler.get_page_tile(0, 3.0, col, row, 512)
+            for col in range(2)
+            for row in range(2)
+        }
+        self.assertEqual(sum(t.width for (c, r), t in tiles.items() if r == 0), width * 3)
+        self.assertEqual(sum(t.height for (c, r), t in tiles.items() if c == 0), height * 3)
+        self.assertIsNone(handler.get_page_tile(0, 3.0, 2, 0, 512))
+
+        handler.get_page_tile(0, 3.0, 0, 0, 512)
+        self.assertEqual(handler.render_cache.hits, 1)
+        handler.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
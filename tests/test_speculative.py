@@ -0,0 +1,90 @@
+import os
+import sys
+import threading
+import unittest
+from concurrent.futures import Future
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.speculative_service import SpeculativeAnalyzer
+
+
+class FakeRendered:
+    def to_image(self):
+        return "image"
+
+
+class FakeAnalyzer:
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.calls = []
+
+    def analyze_page(self, image_data, model="default"):
+        if self.gate is not None:
+            self.gate.wait(timeout=10)
+        self.calls.append(model)
+        return {"tolls": [{"amount": 1.0, "quantity": 1}], "total_calculated": 1.0}
+
+
+def instant_render(path, page_idx):
+    future = Future()
+    future.set_result(FakeRendered())
+    return future
+
+
+class TestSpeculativeAnalyzer(unittest.TestCase):
+    def test_targets_are_analyzed_and_taken(self):
+        analyzer = FakeAnalyzer()
+        spec = SpeculativeAnalyzer(analyzer, instant_render, max_concurrent=2)
+        spec.update([("a.pdf", 1), ("b.pdf", 0)], model="m1")
+
+        result = spec.take(("a.pdf", 1)).result(timeout=10)
+        self.assertEqual(result["total_calculated"], 1.0)
+        self.assertIsNone(spec.take(("a.pdf", 1)))
+        spec.shutdown()
+
+    def test_skipped_pages_are_cancelled(self):
+        gate = threading.Event()
+        analyzer = FakeAnalyzer(gate)
+        spec = SpeculativeAnalyzer(analyzer, instant_render, max_concurrent=1)
+        spec.update([("a.pdf", 1), ("a.pdf", 2), ("a.pdf", 3)], model="m1")
+        queued = spec._jobs[("a.pdf", 3)]
+
+        spec.update([("a.pdf", 2)], model="m1")
+        gate.set()
+
+        self.assertTrue(queued.cancelled())
+        self.assertEqual(list(spec._jobs), [("a.pdf", 2)])
+        spec.shutdown()
+
+    def test_model_change_discards_previous_jobs(self):
+        analyzer = FakeAnalyzer()
+        spec = SpeculativeAnalyzer(analyzer, instant_render)
+        spec.update([("a.pdf", 1)], model="m1")
+        first = spec._jobs[("a.pdf", 1)]
+        spec.update([("a.pdf", 1)], model="m2")
+
+        self.assertIsNot(spec._jobs[("a.pdf", 1)], first)
+        spec.shutdown()
+
+    def test_text_layer_skips_the_ai(self):
+        analyzer = FakeAnalyzer()
+
+        def read_text(path, page_idx):
+            future = Future()
+            text = {"tolls": [], "total_calculated": 2.0, "source": "text"}
+            future.set_result(text if page_idx == 1 else None)
+            return future
+
+        spec = SpeculativeAnalyzer(analyzer, instant_render, read_text=read_text)
+        spec.update([("a.pdf", 1), ("a.pdf", 2)], model="m1")
+
+        self.assertEqual(spec.take(("a.pdf", 1)).result(timeout=10)["source"], "text")
+        self.assertEqual(spec.take(("a.pdf", 2)).result(timeout=10)["total_calculated"], 1.0)
+        self.assertEqual(analyzer.calls, ["m1"])
+        spec.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import fitz
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services.pdf_service import PDFHandler
+from utils.amount_utils import parse_amount
+
+
+def make_text_pdf(path, lines):
+    doc = fitz.open()
+    page = doc.new_page(width=300, height=400)
+    for i, line in enumerate(lines):
+        page.insert_text((20, 40 + i * 20), line)
+    doc.save(path)
+    doc.close()
+
+
+class TestParseAmount(unittest.TestCase):
+    def test_formats(self):
+        self.assertEqual(parse_amount("5.50"), 5.5)
+        self.assertEqual(parse_amount("5,50"), 5.5)
+        self.assertEqual(parse_amount("1.234,56"), 1234.56)
+        self.assertEqual(parse_amount("1,234.56"), 1234.56)
+        self.assertEqual(parse_amount("$3.00"), 3.0)
+        self.assertIsNone(parse_amount("12.05.2026"))
+        self.assertIsNone(parse_amount("2026"))
+
+
+class TestTextLayer(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.handler = PDFHandler()
+
+    def tearDown(self):
+        self.handler.close()
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def open(self, lines, name="page.pdf"):
+        path = os.path.join(self.tmp_dir, name)
+        make_text_pdf(path, lines)
+        self.handler.open_pdf(path)
+
+    def test_amounts_grouped_and_checked_against_total(self):
+        self.open(["Peaje A 5,50", "Peaje B 5,50", "Peaje C 3,00", "Total: 14,00"])
+        result = self.handler.extract_text_tolls(0)
+
+        self.assertEqual(
+            result["tolls"],
+            [{"amount": 5.5, "quantity": 2}, {"amount": 3.0, "quantity": 1}],
+        )
+        self.assertAlmostEqual(result["total_calculated"], 14.0)
+        self.assertEqual(result["confidence"], 1.0)
+
+    def test_mismatched_total_falls_back_to_ai(self):
+        self.open(["Peaje A 5,50", "Peaje B 3,00", "Total: 99,00"])
+        self.assertIsNone(self.handler.extract_text_tolls(0))
+
+    def test_subtotal_and_tax_are_not_counted_as_tolls(self):
+        self.open(["Peaje 5,00", "Subtotal 4,20", "IVA 0,80"])
+        self.assertIsNone(self.handler.extract_text_tolls(0))
+
+        result = self.handler.extract_text_tolls(0, 0.0)
+        self.assertEqual(result["tolls"], [{"amount": 5.0, "quantity": 1}])
+        self.assertAlmostEqual(result["total_calculated"], 5.0)
+
+        self.open(["Peaje 5,00", "Subtotal 4,20", "IVA 0,80", "Total: 5,00"], "total.pdf")
+        result = self.handler.extract_text_tolls(0)
+        self.assertAlmostEqual(result["total_calculated"], 5.0)
+        self.assertEqual(result["confidence"], 1.0)
+
+    def test_page_without_text_falls_back_to_ai(self):
+        self.open([])
+        self.assertIsNone(self.handler.extract_text_tolls(0))
+
+
+if __name__ == "__main__":
+    unittest.main()
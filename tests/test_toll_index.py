@@ -0,0 +1,224 @@
+import os
+import sys
+import threading
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from openpyxl import load_workbook
+from openpyxl.styles import Font
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from services import data_service
+from services.data_service import DataService
+from services.toll_index import WorkbookIndex, get_index
+from tests.data_service_case import DataServiceTestCase
+
+
+class TestTollIndex(DataServiceTestCase):
+    def save(self, pdf_name, page):
+        data = {"PDF Name": pdf_name, "Page Number": page, "Total Amount": 1.0}
+        return DataService.save_toll_entry(self.tmp_dir, data)
+
+    def count_loads(self):
+        """Patches WorkbookIndex._load; the mock counts workbook parses."""
+        patcher = mock.patch.object(
+            WorkbookIndex, "_load", autospec=True, side_effect=WorkbookIndex._load
+        )
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_own_writes_do_not_reparse_the_workbook(self):
+        self.save("a.pdf", 1)
+        loads = self.count_loads()
+
+        self.save("a.pdf", 2)
+        for _ in range(5):
+            self.assertTrue(DataService.has_toll_entry("a.pdf", 2, self.tmp_dir))
+            self.assertFalse(DataService.has_toll_entry("a.pdf", 3, self.tmp_dir))
+
+        self.assertEqual(loads.call_count, 0)
+        index = get_index(self.excel_path)
+        self.assertEqual(index.find("a.pdf", 2), [2])
+        self.assertEqual(index.detail_rows[2], 3)
+        self.assertEqual(index.calc_rows[2], 4)
+
+    def test_external_edit_triggers_reload(self):
+        self.save("a.pdf", 1)
+        wb = load_workbook(self.excel_path)
+        wb["Calculo"].append([7, 3.0])
+        wb["Detalle"].append([7, "b.pdf", 4, 3.0, "2026-01-01 00:00:00"])
+        wb.save(self.excel_path)
+        loads = self.count_loads()
+
+        self.assertTrue(DataService.has_toll_entry("b.pdf", 4, self.tmp_dir))
+        self.assertEqual(loads.call_count, 1)
+        self.save("b.pdf", 5)
+        self.assertEqual(get_index(self.excel_path).find("b.pdf", 5), [8])
+
+    def test_processed_set_follows_saves_and_deletes(self):
+        self.save("a.pdf", 1)
+        self.save("a.pdf", 2)
+        self.save("b.pdf", 1)
+        loads = self.count_loads()
+
+        self.assertEqual(DataService.get_processed_tolls(self.tmp_dir), {"a.pdf", "b.pdf"})
+        DataService.delete_toll_entry("a.pdf", 1, self.tmp_dir)
+        self.assertIn("a.pdf", DataService.get_processed_tolls(self.tmp_dir))
+        DataService.delete_toll_entry("a.pdf", 2, self.tmp_dir)
+        self.assertEqual(DataService.get_processed_tolls(self.tmp_dir), {"b.pdf"})
+        self.assertEqual(loads.call_count, 0)
+
+    def test_remove_moves_later_rows_up(self):
+        for page in (1, 2, 3):
+            self.save("a.pdf", page)
+
+        success, _ = DataService.delete_toll_entry("a.pdf", 2, self.tmp_dir)
+
+        self.assertTrue(success)
+        index = get_index(self.excel_path)
+        self.assertEqual(index.find("a.pdf", 2), [])
+        self.assertEqual(index.detail_rows, {1: 2, 3: 3})
+        self.assertEqual(index.calc_rows, {1: 3, 3: 4})
+        # The index still matches a fresh parse of the file
+        fresh = WorkbookIndex(self.excel_path)
+        fresh.refresh()
+        self.assertEqual(fresh.detail_rows, index.detail_rows)
+        self.assertEqual(fresh.calc_rows, index.calc_rows)
+
+    def test_delete_is_in_place_and_keeps_formatting(self):
+        for page in (1, 2, 3):
+            self.save("a.pdf", page)
+        wb = load_workbook(self.excel_path)
+        wb["Detalle"]["B4"].font = Font(italic=True)
+        wb["Calculo"].column_dimensions["B"].width = 33
+        wb.save(self.excel_path)
+
+        DataService.delete_toll_entry("a.pdf", 2, self.tmp_dir)
+
+        wb = load_workbook(self.excel_path)
+        self.assertEqual([c.value for c in wb["Detalle"]["A"]], ["No.", 1, 3])
+        self.assertTrue(wb["Detalle"]["B3"].font.italic)
+        self.assertEqual(wb["Calculo"].column_dimensions["B"].width, 33)
+        self.assertEqual(wb["Calculo"]["A1"].value, f"Calculo peajes {datetime.now().year}")
+
+    def test_refresh_during_flush_does_not_index_twice(self):
+        self.save("a.pdf", 1)
+        index = get_index(self.excel_path)
+        real_replace = os.replace
+        readers = []
+
+        def replace_then_read(src, dst):
+            real_replace(src, dst)
+            if dst == self.excel_path and not readers:
+                # Another thread looks the workbook up right after the swap
+                reader = threading.Thread(target=get_index, args=(dst,))
+                readers.append(reader)
+                reader.start()
+                reader.join(0.2)
+
+        with mock.patch("services.data_service.os.replace", replace_then_read):
+            self.save("a.pdf", 2)
+        readers[0].join()
+
+        self.assertEqual(index.find("a.pdf", 2), [2])
+        self.assertEqual(index.pdf_counts["a.pdf"], 2)
+        index.add(2, "a.pdf", 2, 3, 4)
+        self.assertEqual(index.find("a.pdf", 2), [2])
+
+        DataService.delete_toll_entry("a.pdf", 2, self.tmp_dir)
+        wb = load_workbook(self.excel_path)
+        self.assertEqual([c.value for c in wb["Detalle"]["A"]], ["No.", 1])
+
+    def test_delete_during_flush_stays_deleted(self):
+        self.save("a.pdf", 1)
+        DataService.save_toll_entry(
+            self.tmp_dir,
+            {"PDF Name": "a.pdf", "Page Number": 2, "Total Amount": 1.0},
+            materialize=False,
+        )
+        real_apply = DataService._apply_records
+
+        def apply_then_delete(*args):
+            result = real_apply(*args)
+            # Clean Toll on the Tk thread while the flush is writing
+            DataService.delete_toll_entry("a.pdf", 2, self.tmp_dir, materialize=False)
+            return result
+
+        with mock.patch.object(DataService, "_apply_records", apply_then_delete):
+            DataService.materialize(self.tmp_dir)
+
+        self.assertFalse(DataService.has_toll_entry("a.pdf", 2, self.tmp_dir))
+        success, _ = DataService.delete_toll_entry("a.pdf", 2, self.tmp_dir)
+        self.assertFalse(success)
+        DataService.materialize(self.tmp_dir)
+        wb = load_workbook(self.excel_path)
+        self.assertEqual([c.value for c in wb["Detalle"]["A"]], ["No.", 1])
+        self.assertEqual(len(data_service._journal), 0)
+
+    def test_deferred_delete_is_hidden_until_written(self):
+        for page in (1, 2, 3):
+            self.save("a.pdf", page)
+        loads = self.count_loads()
+
+        success, _ = DataService.delete_toll_entry(
+            "a.pdf", 2, self.tmp_dir, materialize=False
+        )
+
+        self.assertTrue(success)
+        self.assertFalse(DataService.has_toll_entry("a.pdf", 2, self.tmp_dir))
+        wb = load_workbook(self.excel_path)
+        self.assertEqual([c.value for c in wb["Detalle"]["A"]], ["No.", 1, 2, 3])
+
+        DataService.materialize(self.tmp_dir)
+        wb = load_workbook(self.excel_path)
+        self.assertEqual([c.value for c in wb["Detalle"]["A"]], ["No.", 1, 3])
+        self.assertEqual(loads.call_count, 0)
+        self.assertEqual(get_index(self.excel_path).calc_rows, {1: 3, 3: 4})
+
+    def test_pending_delete_survives_reparse(self):
+        self.save("a.pdf", 1)
+        self.save("a.pdf", 2)
+        DataService.delete_toll_entry("a.pdf", 2, self.tmp_dir, materialize=False)
+        wb = load_workbook(self.excel_path)
+        wb["Calculo"].append([9, 3.0])
+        wb["Detalle"].append([9, "b.pdf", 1, 3.0, "2026-01-01 00:00:00"])
+        wb.save(self.excel_path)
+
+        self.assertFalse(DataService.has_toll_entry("a.pdf", 2, self.tmp_dir))
+        self.assertTrue(DataService.has_toll_entry("b.pdf", 1, self.tmp_dir))
+
+        DataService.materialize(self.tmp_dir)
+        wb = load_workbook(self.excel_path)
+        self.assertEqual([c.value for c in wb["Detalle"]["A"]], ["No.", 1, 9])
+
+    def test_deleted_page_can_be_saved_again(self):
+        self.save("a.pdf", 1)
+        self.save("a.pdf", 2)
+        DataService.delete_toll_entry("a.pdf", 2, self.tmp_dir, materialize=False)
+
+        self.save("a.pdf", 2)
+
+        wb = load_workbook(self.excel_path)
+        self.assertEqual([c.value for c in wb["Calculo"]["A"]][2:], [1, 2])
+        self.assertEqual(get_index(self.excel_path).find("a.pdf", 2), [2])
+        self.assertEqual(len(data_service._journal), 0)
+
+    def test_delete_falls_back_when_index_rows_are_off(self):
+        for page in (1, 2, 3):
+            self.save("a.pdf", page)
+        index = get_index(self.excel_path)
+        index.detail_rows[2] = 4  # Row of toll 3
+
+        success, _ = DataService.delete_toll_entry("a.pdf", 2, self.tmp_dir)
+
+        self.assertTrue(success)
+        wb = load_workbook(self.excel_path)
+        self.assertEqual([c.value for c in wb["Detalle"]["A"]], ["No.", 1, 3])
+        self.assertEqual(get_index(self.excel_path).detail_rows, {1: 2, 3: 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
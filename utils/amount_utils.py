@@ -0,0 +1,23 @@
+import re
+
+# Optional currency prefix, digits with optional thousands groups, 2 decimals
+AMOUNT_PATTERN = re.compile(
+    r"^(?:Bs\.?S?|BS\.?|\$)?\s*(\d{1,3}(?:[.,\s]\d{3})*|\d+)([.,])(\d{2})$",
+    re.IGNORECASE,
+)
+
+
+def parse_amount(text):
+    """
+    Parses a currency amount written as "5.50", "5,50", "1.234,56",
+    "1,234.56" or "Bs. 12,50" into a float. Returns None if text is not
+    an amount with two decimals.
+    """
+    if text is None:
+        return None
+    cleaned = str(text).strip().rstrip(";:")
+    match = AMOUNT_PATTERN.match(cleaned)
+    if not match:
+        return None
+    integer = re.sub(r"[.,\s]", "", match.group(1))
+    return float(f"{integer}.{match.group(3)}")